@@ -25,14 +25,17 @@ class Common(Configuration):
         "debug_toolbar",  # debug tool
         # Your apps
         "fridger.fridges",
+        "fridger.notifications",
         "fridger.products",
         "fridger.shopping_lists",
+        "fridger.sync",
         "fridger.users",
     )
 
     # https://docs.djangoproject.com/en/2.0/topics/http/middleware/
     MIDDLEWARE = (
         "debug_toolbar.middleware.DebugToolbarMiddleware",
+        "fridger.utils.middleware.QueryBudgetMiddleware",
         "django.middleware.security.SecurityMiddleware",
         "django.contrib.sessions.middleware.SessionMiddleware",
         "django.middleware.common.CommonMiddleware",
@@ -163,6 +166,7 @@ class Common(Configuration):
                 "propagate": False,
             },
             "django.db.backends": {"handlers": ["console"], "level": "INFO"},
+            "fridger": {"handlers": ["console"], "level": "WARNING"},
         },
     }
 
@@ -192,7 +196,29 @@ class Common(Configuration):
         "DEFAULT_PERMISSION_CLASSES": [
             "rest_framework.permissions.IsAuthenticated",
         ],
-        "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework.authentication.TokenAuthentication",),
+        "DEFAULT_AUTHENTICATION_CLASSES": ("fridger.users.authentication.CachedTokenAuthentication",),
         "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
         "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     }
+
+    # Queries allowed per request before a warning is logged, `QUERY_BUDGETS` overrides it for endpoints
+    QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", 20))
+    QUERY_BUDGETS = {}
+
+    # Token authentication cache, alias of Django cache shared by all processes or in process LRU when empty.
+    # In process entries are evicted only in the process handling logout, so keep their timeout short.
+    TOKEN_AUTHENTICATION_CACHE = os.getenv("TOKEN_AUTHENTICATION_CACHE", "")
+    TOKEN_AUTHENTICATION_CACHE_TIMEOUT = int(os.getenv("TOKEN_AUTHENTICATION_CACHE_TIMEOUT", 60))
+    TOKEN_AUTHENTICATION_CACHE_SIZE = int(os.getenv("TOKEN_AUTHENTICATION_CACHE_SIZE", 10000))
+
+    # Push notifications outbox
+    PUSH_NOTIFICATIONS_SENDER = os.getenv("PUSH_NOTIFICATIONS_SENDER", "fridger.notifications.senders.ExpoSender")
+    PUSH_NOTIFICATIONS_EXPO_HOST = os.getenv("PUSH_NOTIFICATIONS_EXPO_HOST")
+    PUSH_NOTIFICATIONS_MAX_ATTEMPTS = int(os.getenv("PUSH_NOTIFICATIONS_MAX_ATTEMPTS", 5))
+
+    # Offline sync, cursors go back by the overlap in seconds so rows of late committed writes are not missed.
+    # Tombstones are pruned after the retention, clients with older cursors get whole data.
+    SYNC_CURSOR_OVERLAP = int(os.getenv("SYNC_CURSOR_OVERLAP", 5))
+    SYNC_TOMBSTONE_RETENTION_DAYS = int(os.getenv("SYNC_TOMBSTONE_RETENTION_DAYS", 30))
+    # Idempotency keys of uploaded mutations, replays of older operations run them again
+    SYNC_IDEMPOTENCY_KEY_RETENTION_DAYS = int(os.getenv("SYNC_IDEMPOTENCY_KEY_RETENTION_DAYS", 30))
@@ -1,9 +1,32 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(queryset):
+    return Coalesce(
+        Subquery(queryset.order_by().values("fridge").annotate(count=Count("pk")).values("count")),
+        0,
+    )
 
 
 class FridgeQuerySet(models.QuerySet):
-    def user_fridges(self, user):
-        return self.filter(fridge_ownership__user=user)
+    def user_fridges(self, user, with_counts=False):
+        fridges = self.filter(fridge_ownership__user=user)
+        if with_counts:
+            fridges = fridges.with_counts()
+        return fridges
+
+    def with_counts(self):
+        FridgeOwnership = apps.get_model("fridges", "FridgeOwnership")
+        FridgeProduct = apps.get_model("products", "FridgeProduct")
+        return self.annotate(
+            ownerships_count=_count_subquery(FridgeOwnership.objects.filter(fridge=OuterRef("pk"))),
+            available_products_count=_count_subquery(
+                FridgeProduct.objects.filter(fridge=OuterRef("pk"), is_available=True)
+            ),
+        )
 
 
 class FridgeOwnershipsQuerySet(models.QuerySet):
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fridges', '0005_fridgeownership_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fridge',
+            index=models.Index(fields=['created_at', 'id'], name='fridge_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fridges', '0006_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fridgeownership',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
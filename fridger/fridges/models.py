@@ -17,13 +17,20 @@ class Fridge(BaseModel):
 
     objects = FridgeQuerySet.as_manager()
 
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="fridge_keyset_idx")]
+
     @property
     def shared_with_count(self) -> int:
         # reduce by one because of the owner
+        if hasattr(self, "ownerships_count"):
+            return self.ownerships_count - 1
         return self.fridge_ownership.count() - 1
 
     @property
     def products_count(self) -> int:
+        if hasattr(self, "available_products_count"):
+            return self.available_products_count
         return self.fridge_product.filter(is_available=True).count()
 
     @property
@@ -41,6 +48,7 @@ class FridgeOwnership(BaseModel):
         _("User permission to fridger"), choices=UserPermission.choices, default=UserPermission.READ, max_length=7
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = FridgeOwnershipsQuerySet.as_manager()
 
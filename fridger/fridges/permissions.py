@@ -1,17 +1,11 @@
 from rest_framework import permissions
 
-from fridger.utils.enums import UserPermission
-
-from .models import FridgeOwnership
+from fridger.utils.ownerships import ADMIN_PERMISSIONS, get_ownerships
 
 
 class IsFrigeAdminOrCreator(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = obj.fridge_ownership.get(user=request.user)
-        except FridgeOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR]
+        return get_ownerships(request).fridge_permission(obj.id) in ADMIN_PERMISSIONS
 
 
 class IsOwnershipCurrentUser(permissions.BasePermission):
@@ -21,8 +15,4 @@ class IsOwnershipCurrentUser(permissions.BasePermission):
 
 class IsOwnershipAdminOrCreator(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = FridgeOwnership.objects.get(user=request.user, fridge=obj.fridge)
-        except FridgeOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR]
+        return get_ownerships(request).fridge_permission(obj.fridge_id) in ADMIN_PERMISSIONS
@@ -4,6 +4,7 @@ from rest_framework import exceptions, serializers
 
 from fridger.users.serializers import BasicUserSerializer
 from fridger.utils.enums import UserPermission
+from fridger.utils.ownerships import WRITE_PERMISSIONS, get_ownerships
 
 from .models import Fridge, FridgeOwnership
 
@@ -40,7 +41,8 @@ class FridgeSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context["request"].user
         fridge = Fridge.objects.create(**validated_data)
-        FridgeOwnership.objects.create(user=user, fridge=fridge, permission=UserPermission.CREATOR)
+        ownership = FridgeOwnership.objects.create(user=user, fridge=fridge, permission=UserPermission.CREATOR)
+        get_ownerships(self.context["request"]).add("fridge", ownership)
         return fridge
 
 
@@ -70,8 +72,7 @@ class FridgeDetailSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(CurrentUserFridgeOwnershipSerializer)
     def get_my_ownership(self, obj):
-        user = self.context["request"].user
-        ownership = obj.fridge_ownership.get(user=user)
+        ownership = get_ownerships(self.context["request"]).fridge_ownership(obj.id)
         return CurrentUserFridgeOwnershipSerializer(ownership).data
 
 
@@ -111,14 +112,12 @@ class CreateFridgeOwnershipSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, attrs):
-        request_user = self.context.get("request").user
         fridge = attrs.get("fridge")
-        try:
-            ownership = request_user.fridge_ownership.get(fridge=fridge)
-        except FridgeOwnership.DoesNotExist:
+        permission = get_ownerships(self.context.get("request")).fridge_permission(fridge.id)
+        if permission is None:
             raise exceptions.PermissionDenied(_("User does not belong to this fridge."))
 
-        if ownership.permission not in [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]:
+        if permission not in WRITE_PERMISSIONS:
             raise exceptions.PermissionDenied(_("User does not have permission to add friend to this fridge."))
 
         return attrs
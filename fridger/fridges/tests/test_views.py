@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
@@ -82,6 +84,42 @@ class TestFridgesViews:
         assert json_response["products_count"] == 1
         assert json_response.get("my_ownership") is not None
 
+    def test_list_fridges_counts(self, django_assert_num_queries):
+        client = APIClient()
+        client.force_authenticate(self.test_user)
+        fridges = baker.make("fridges.Fridge", _quantity=5)
+        for fridge in fridges:
+            baker.make("fridges.FridgeOwnership", fridge=fridge, user=self.test_user)
+            baker.make("fridges.FridgeOwnership", fridge=fridge, _quantity=2)
+            baker.make("products.FridgeProduct", fridge=fridge, is_available=True, _quantity=3)
+            baker.make("products.FridgeProduct", fridge=fridge, is_available=False)
+
+        with django_assert_num_queries(1):
+            response = client.get(self.url)
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert len(json_response) == 5
+        assert all(fridge["shared_with_count"] == 2 for fridge in json_response)
+        assert all(fridge["products_count"] == 3 for fridge in json_response)
+
+    def test_update_fridge_loads_ownerships_once(self):
+        client = APIClient()
+        client.force_authenticate(self.test_user)
+        fridge = baker.make("fridges.Fridge")
+        baker.make("fridges.FridgeOwnership", fridge=fridge, user=self.test_user, permission=UserPermission.ADMIN)
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.put(self._get_detail_url(fridge.id), {"name": "Fridge"})
+        ownership_queries = [
+            query["sql"]
+            for query in context.captured_queries
+            if 'WHERE "fridges_fridgeownership"."user_id"' in query["sql"]
+        ]
+
+        assert response.status_code == 200
+        assert len(ownership_queries) == 1
+
     def test_list_fridge_ownerships(self):
         client = APIClient()
         client.force_authenticate(self.test_user)
@@ -2,6 +2,8 @@ from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from fridger.utils.pagination import KeysetPagination
+
 from .models import Fridge, FridgeOwnership
 from .permissions import (
     IsFrigeAdminOrCreator,
@@ -22,10 +24,12 @@ class FridgeViewSet(viewsets.ModelViewSet):
 
     queryset = Fridge.objects.none()
     serializer_class = FridgeSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         user = self.request.user
-        return Fridge.objects.user_fridges(user).order_by("-created_at")
+        with_counts = self.action in ["list", "retrieve"]
+        return Fridge.objects.user_fridges(user, with_counts=with_counts).order_by("-created_at")
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -0,0 +1,8 @@
+from django.contrib import admin
+
+from .models import ProductExpirationNotification, PushNotification, PushTicket
+
+# Register your models here.
+admin.site.register(PushNotification)
+admin.site.register(PushTicket)
+admin.site.register(ProductExpirationNotification)
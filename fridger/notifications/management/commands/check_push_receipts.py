@@ -0,0 +1,66 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from exponent_server_sdk import PushClient
+from exponent_server_sdk import PushTicket as ExpoPushTicket
+
+from fridger.notifications.managers import prune_mobile_tokens
+from fridger.notifications.models import PushTicket
+from fridger.notifications.senders import get_sender
+from fridger.utils.enums import PushTicketStatus
+
+# Expo recommends waiting before checking receipts and keeps them for a day
+RECEIPT_DELAY = datetime.timedelta(minutes=15)
+RECEIPT_EXPIRATION = datetime.timedelta(days=1)
+
+
+class Command(BaseCommand):
+    help = "Check receipts of sent push notifications and clear mobile tokens of devices which are not registered."
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        sender = get_sender()
+        tickets = PushTicket.objects.filter(status=PushTicketStatus.PENDING, created_at__lte=now - RECEIPT_DELAY)
+        tickets = list(tickets.exclude(ticket_id=""))
+
+        pruned = 0
+        batch_size = PushClient.DEFAULT_MAX_RECEIPT_COUNT
+        for start in range(0, len(tickets), batch_size):
+            batch = tickets[start : start + batch_size]
+            receipts = {receipt.id: receipt for receipt in sender.check_receipts([t.ticket_id for t in batch])}
+            pruned += self._record_receipts(batch, receipts, now)
+
+        stats = PushTicket.objects.stats(since=now - RECEIPT_EXPIRATION)
+        self.stdout.write(
+            f"Checked {len(tickets)} receipts, pruned {pruned} mobile tokens. "
+            f"Last day: {stats['sent']} sent, {stats['failed']} failed, {stats['pruned']} pruned."
+        )
+
+    def _record_receipts(self, tickets, receipts, now):
+        checked_tickets = []
+        for ticket in tickets:
+            receipt = receipts.get(ticket.ticket_id)
+            if receipt is None:
+                # receipt is not ready yet, or it was lost when Expo did not deliver it in time
+                if ticket.created_at > now - RECEIPT_EXPIRATION:
+                    continue
+                ticket.status = PushTicketStatus.FAILED
+                ticket.message = "Receipt expired."
+            elif receipt.is_success():
+                ticket.status = PushTicketStatus.DELIVERED
+            else:
+                ticket.status = PushTicketStatus.FAILED
+                ticket.error = (receipt.details or {}).get("error", "")
+                ticket.message = receipt.message or ""
+                ticket.token_pruned = ticket.error == ExpoPushTicket.ERROR_DEVICE_NOT_REGISTERED
+            ticket.checked_at = now
+            checked_tickets.append(ticket)
+
+        with transaction.atomic():
+            PushTicket.objects.bulk_update(
+                checked_tickets, ["status", "error", "message", "token_pruned", "checked_at"], batch_size=1000
+            )
+            prune_mobile_tokens({ticket.mobile_token for ticket in checked_tickets if ticket.token_pruned})
+        return sum(ticket.token_pruned for ticket in checked_tickets)
@@ -0,0 +1,106 @@
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from exponent_server_sdk import PushClient
+from exponent_server_sdk import PushTicket as ExpoPushTicket
+
+from fridger.notifications.models import PushNotification, PushTicket
+from fridger.notifications.senders import get_sender
+from fridger.utils.enums import PushNotificationStatus
+
+# claimed notifications are skipped by other workers, and retried when worker dies before sending them
+CLAIM_TIMEOUT = datetime.timedelta(minutes=5)
+RETRY_DELAY = datetime.timedelta(seconds=30)
+MAX_RETRY_DELAY = datetime.timedelta(hours=1)
+NOT_RETRIED_ERRORS = {ExpoPushTicket.ERROR_DEVICE_NOT_REGISTERED, ExpoPushTicket.ERROR_MESSAGE_TOO_BIG}
+
+
+class Command(BaseCommand):
+    help = "Send pending push notifications from the outbox, retrying failed ones with exponential backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=4, help="Number of batches sent concurrently.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=PushClient.DEFAULT_MAX_MESSAGE_COUNT,
+            help="Number of notifications sent in one request.",
+        )
+        parser.add_argument("--interval", type=float, default=5, help="Seconds to wait when the outbox is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit when there are no due notifications.")
+
+    def handle(self, *args, **options):
+        self.senders = threading.local()
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            while True:
+                notifications = self._claim(options["batch_size"] * options["workers"])
+                if notifications:
+                    self._send(executor, notifications, options["batch_size"])
+                elif options["once"]:
+                    break
+                else:
+                    time.sleep(options["interval"])
+
+    def _claim(self, limit):
+        with transaction.atomic():
+            notifications = list(
+                PushNotification.objects.due().select_for_update(skip_locked=True).order_by("next_attempt_at")[:limit]
+            )
+            PushNotification.objects.filter(id__in=[notification.id for notification in notifications]).update(
+                next_attempt_at=timezone.now() + CLAIM_TIMEOUT
+            )
+        return notifications
+
+    def _send(self, executor, notifications, batch_size):
+        batches = [notifications[start : start + batch_size] for start in range(0, len(notifications), batch_size)]
+        now = timezone.now()
+        counts = {status: 0 for status in PushNotificationStatus}
+        with transaction.atomic():
+            for batch, (push_tickets, error) in zip(batches, executor.map(self._send_batch, batches)):
+                if error:
+                    push_tickets = [None] * len(batch)
+                else:
+                    PushTicket.objects.record(push_tickets)
+                for notification, push_ticket in zip(batch, push_tickets):
+                    self._record_attempt(notification, push_ticket, error, now)
+                    counts[notification.status] += 1
+            PushNotification.objects.bulk_update(
+                notifications, ["status", "attempts", "next_attempt_at", "error", "sent_at"], batch_size=1000
+            )
+        self.stdout.write(
+            f"Sent {counts[PushNotificationStatus.SENT]} notifications, "
+            f"{counts[PushNotificationStatus.FAILED]} failed, {counts[PushNotificationStatus.PENDING]} to retry."
+        )
+
+    def _send_batch(self, batch):
+        """Runs in worker thread, only talks to the push service."""
+        if not hasattr(self.senders, "sender"):
+            self.senders.sender = get_sender()
+        try:
+            return self.senders.sender.send([notification.push_message for notification in batch]), None
+        except Exception as error:
+            return None, repr(error)
+
+    def _record_attempt(self, notification, push_ticket, error, now):
+        notification.attempts += 1
+        if push_ticket and push_ticket.is_success():
+            notification.status = PushNotificationStatus.SENT
+            notification.sent_at = now
+            notification.error = ""
+            return
+
+        retry = True
+        if push_ticket:
+            error = push_ticket.message
+            retry = (push_ticket.details or {}).get("error") not in NOT_RETRIED_ERRORS
+        notification.error = error
+        if not retry or notification.attempts >= settings.PUSH_NOTIFICATIONS_MAX_ATTEMPTS:
+            notification.status = PushNotificationStatus.FAILED
+        else:
+            notification.next_attempt_at = now + min(RETRY_DELAY * 2 ** (notification.attempts - 1), MAX_RETRY_DELAY)
@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+from django.db.models import Count, Q
+from django.utils import timezone
+from exponent_server_sdk import PushTicket as ExpoPushTicket
+
+from fridger.utils.enums import PushNotificationStatus, PushTicketStatus
+
+
+def prune_mobile_tokens(mobile_tokens):
+    """Stop sending notifications to devices which are not registered anymore."""
+    if not mobile_tokens:
+        return 0
+    return get_user_model().objects.filter(mobile_token__in=mobile_tokens).update(mobile_token="")
+
+
+class PushNotificationQuerySet(models.QuerySet):
+    def enqueue(self, mobile_token, title, body, data=None):
+        """Add notification to the outbox, it is sent by `send_push_notifications` after the transaction commits."""
+        return self.create(mobile_token=mobile_token, title=title, body=body, data=data or {})
+
+    def due(self):
+        return self.filter(status=PushNotificationStatus.PENDING, next_attempt_at__lte=timezone.now())
+
+
+class PushTicketQuerySet(models.QuerySet):
+    def record(self, expo_push_tickets):
+        """Store tickets of published messages, receipts of successful ones are checked by `check_push_receipts`."""
+        tickets = []
+        for expo_push_ticket in expo_push_tickets:
+            error = (expo_push_ticket.details or {}).get("error", "")
+            tickets.append(
+                self.model(
+                    ticket_id=expo_push_ticket.id or "",
+                    mobile_token=expo_push_ticket.push_message.to,
+                    status=PushTicketStatus.PENDING if expo_push_ticket.is_success() else PushTicketStatus.FAILED,
+                    error=error,
+                    message=expo_push_ticket.message or "",
+                    token_pruned=error == ExpoPushTicket.ERROR_DEVICE_NOT_REGISTERED,
+                )
+            )
+        prune_mobile_tokens({ticket.mobile_token for ticket in tickets if ticket.token_pruned})
+        return self.bulk_create(tickets)
+
+    def stats(self, since=None):
+        tickets = self.filter(created_at__gte=since) if since else self
+        return tickets.aggregate(
+            sent=Count("id"),
+            failed=Count("id", filter=Q(status=PushTicketStatus.FAILED)),
+            pruned=Count("id", filter=Q(token_pruned=True)),
+        )
+
+
+class ProductExpirationNotificationQuerySet(models.QuerySet):
+    def record(self, products):
+        """Mark expiration thresholds of `products` annotated by `FridgeProductQuerySet.expiring` as notified."""
+        return self.bulk_create(
+            [
+                self.model(
+                    product=product,
+                    expiration_date=product.expiration_date,
+                    threshold=product.expiration_threshold,
+                )
+                for product in products
+            ],
+            ignore_conflicts=True,
+        )
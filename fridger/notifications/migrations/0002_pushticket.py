@@ -0,0 +1,32 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:37
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PushTicket',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('ticket_id', models.CharField(blank=True, max_length=64)),
+                ('mobile_token', models.CharField(max_length=60)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('DELIVERED', 'Delivered'), ('FAILED', 'Failed')], default='PENDING', max_length=9)),
+                ('error', models.CharField(blank=True, max_length=32)),
+                ('message', models.TextField(blank=True)),
+                ('token_pruned', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('checked_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='pushticket',
+            index=models.Index(fields=['status', 'created_at'], name='push_ticket_status_idx'),
+        ),
+    ]
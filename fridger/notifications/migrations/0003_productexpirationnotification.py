@@ -0,0 +1,30 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0016_fridgeproducthistory_base_quantity'),
+        ('notifications', '0002_pushticket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductExpirationNotification',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('expiration_date', models.DateField()),
+                ('threshold', models.SmallIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='expiration_notifications', to='products.fridgeproduct')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='productexpirationnotification',
+            constraint=models.UniqueConstraint(fields=('product', 'expiration_date', 'threshold'), name='unique_product_expiration_notification'),
+        ),
+    ]
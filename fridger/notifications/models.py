@@ -0,0 +1,87 @@
+from django.db import models
+from django.utils import timezone
+from exponent_server_sdk import PushMessage
+
+from fridger.notifications.managers import (
+    ProductExpirationNotificationQuerySet,
+    PushNotificationQuerySet,
+    PushTicketQuerySet,
+)
+from fridger.products.models import FridgeProduct
+from fridger.utils.enums import PushNotificationStatus, PushTicketStatus
+from fridger.utils.models import BaseModel
+
+
+class PushNotification(BaseModel):
+    mobile_token = models.CharField(max_length=60)
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        choices=PushNotificationStatus.choices, default=PushNotificationStatus.PENDING, max_length=7
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PushNotificationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"], name="push_notification_due_idx"),
+        ]
+
+    @property
+    def push_message(self):
+        return PushMessage(to=self.mobile_token, title=self.title, body=self.body, data=self.data)
+
+    def __str__(self):
+        return f"{self.title} ({self.status})"
+
+
+class PushTicket(BaseModel):
+    ticket_id = models.CharField(max_length=64, blank=True)
+    mobile_token = models.CharField(max_length=60)
+
+    status = models.CharField(choices=PushTicketStatus.choices, default=PushTicketStatus.PENDING, max_length=9)
+    # Expo error code, e.g. DeviceNotRegistered
+    error = models.CharField(max_length=32, blank=True)
+    message = models.TextField(blank=True)
+    token_pruned = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    checked_at = models.DateTimeField(null=True, blank=True)
+
+    objects = PushTicketQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="push_ticket_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ticket_id} ({self.status})"
+
+
+class ProductExpirationNotification(BaseModel):
+    """Ledger of expiration thresholds already notified, changed expiration date is notified again."""
+
+    product = models.ForeignKey(FridgeProduct, related_name="expiration_notifications", on_delete=models.CASCADE)
+    expiration_date = models.DateField()
+    # days left until expiration, -1 for expired products
+    threshold = models.SmallIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = ProductExpirationNotificationQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["product", "expiration_date", "threshold"], name="unique_product_expiration_notification"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.expiration_date} ({self.threshold})"
@@ -0,0 +1,24 @@
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from exponent_server_sdk import PushClient
+
+
+class ExpoSender:
+    """Send notifications through Expo push API, `PUSH_NOTIFICATIONS_EXPO_HOST` may point to a fake server."""
+
+    def __init__(self):
+        self.client = PushClient(host=settings.PUSH_NOTIFICATIONS_EXPO_HOST)
+
+    def send(self, push_messages):
+        """Publish messages, returns Expo push ticket of every message. Raises exception when whole batch failed."""
+        return self.client.publish_multiple(push_messages)
+
+    def check_receipts(self, ticket_ids):
+        """Receipts of tickets which are ready, Expo keeps them for a day after sending."""
+        return self.client.check_receipts_multiple([SimpleNamespace(id=ticket_id) for ticket_id in ticket_ids])
+
+
+def get_sender():
+    return import_string(settings.PUSH_NOTIFICATIONS_SENDER)()
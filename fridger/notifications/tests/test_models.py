@@ -0,0 +1,173 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from exponent_server_sdk import PushTicket as ExpoPushTicket
+from model_bakery import baker
+
+from fridger.notifications.models import PushNotification, PushTicket
+from fridger.utils.enums import PushNotificationStatus, PushTicketStatus
+
+
+def expo_push_ticket(push_message=None, error=None, ticket_id=""):
+    if error:
+        return ExpoPushTicket(push_message, "error", f"{error} message", {"error": error}, ticket_id)
+    return ExpoPushTicket(push_message, "ok", "", None, ticket_id)
+
+
+class FakeSender:
+    sent = []
+    errors = {}
+    receipts = {}
+
+    def send(self, push_messages):
+        FakeSender.sent.append([push_message.to for push_message in push_messages])
+        if "batch" in FakeSender.errors:
+            raise ConnectionError(FakeSender.errors["batch"])
+        return [
+            expo_push_ticket(push_message, FakeSender.errors.get(push_message.to), f"ticket-{push_message.to}")
+            for push_message in push_messages
+        ]
+
+    def check_receipts(self, ticket_ids):
+        return [
+            expo_push_ticket(error=FakeSender.receipts[ticket_id], ticket_id=ticket_id)
+            for ticket_id in ticket_ids
+            if ticket_id in FakeSender.receipts
+        ]
+
+
+class FakeExpoHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        messages = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        tickets = [
+            {"status": "ok", "id": f"ticket-{index}"}
+            if message["to"] != "ExponentPushToken[invalid]"
+            else {"status": "error", "message": "Not a valid token", "details": {"error": "DeviceNotRegistered"}}
+            for index, message in enumerate(messages)
+        ]
+        response = json.dumps({"data": tickets}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response)))
+        self.end_headers()
+        self.wfile.write(response)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.django_db
+class TestPushNotificationsOutbox:
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.PUSH_NOTIFICATIONS_SENDER = "fridger.notifications.tests.test_models.FakeSender"
+        settings.PUSH_NOTIFICATIONS_MAX_ATTEMPTS = 2
+        FakeSender.sent = []
+        FakeSender.errors = {}
+        FakeSender.receipts = {}
+
+    def _enqueue(self, mobile_token):
+        return PushNotification.objects.enqueue(mobile_token=mobile_token, title="Title", body="Body")
+
+    def test_send_push_notifications_in_batches(self):
+        for index in range(5):
+            self._enqueue(f"ExponentPushToken[{index}]")
+
+        call_command("send_push_notifications", "--once", "--batch-size", "2", stdout=StringIO())
+
+        assert sorted(len(batch) for batch in FakeSender.sent) == [1, 2, 2]
+        assert PushNotification.objects.filter(status=PushNotificationStatus.SENT, attempts=1).count() == 5
+
+    def test_send_push_notifications_retries_with_backoff(self):
+        notification = self._enqueue("ExponentPushToken[a]")
+        FakeSender.errors = {"batch": "Expo is down"}
+
+        call_command("send_push_notifications", "--once", stdout=StringIO())
+        notification.refresh_from_db()
+
+        assert notification.status == PushNotificationStatus.PENDING
+        assert notification.attempts == 1
+        assert "Expo is down" in notification.error
+        assert notification.next_attempt_at > timezone.now()
+
+        PushNotification.objects.update(next_attempt_at=timezone.now())
+        call_command("send_push_notifications", "--once", stdout=StringIO())
+        notification.refresh_from_db()
+
+        assert notification.status == PushNotificationStatus.FAILED
+        assert notification.attempts == 2
+        assert len(FakeSender.sent) == 2
+
+    def test_send_push_notifications_records_message_errors(self):
+        failing = self._enqueue("ExponentPushToken[a]")
+        sent = self._enqueue("ExponentPushToken[b]")
+        FakeSender.errors = {"ExponentPushToken[a]": "MessageRateExceeded"}
+
+        call_command("send_push_notifications", "--once", stdout=StringIO())
+        failing.refresh_from_db()
+        sent.refresh_from_db()
+
+        assert failing.status == PushNotificationStatus.PENDING
+        assert failing.error == "MessageRateExceeded message"
+        assert sent.status == PushNotificationStatus.SENT
+        assert PushTicket.objects.get(mobile_token="ExponentPushToken[b]").ticket_id == "ticket-ExponentPushToken[b]"
+
+    def test_send_push_notifications_prunes_unregistered_device(self):
+        user = baker.make("users.User", mobile_token="ExponentPushToken[a]")
+        notification = self._enqueue("ExponentPushToken[a]")
+        FakeSender.errors = {"ExponentPushToken[a]": "DeviceNotRegistered"}
+
+        call_command("send_push_notifications", "--once", stdout=StringIO())
+        notification.refresh_from_db()
+        user.refresh_from_db()
+
+        assert notification.status == PushNotificationStatus.FAILED
+        assert user.mobile_token == ""
+        assert PushTicket.objects.stats() == {"sent": 1, "failed": 1, "pruned": 1}
+
+    def test_check_push_receipts(self, django_assert_num_queries):
+        users = [baker.make("users.User", mobile_token=f"ExponentPushToken[{index}]") for index in range(3)]
+        for user in users:
+            self._enqueue(user.mobile_token)
+        call_command("send_push_notifications", "--once", stdout=StringIO())
+        PushTicket.objects.update(created_at=timezone.now() - timezone.timedelta(minutes=20))
+        FakeSender.receipts = {
+            "ticket-ExponentPushToken[0]": None,
+            "ticket-ExponentPushToken[1]": "DeviceNotRegistered",
+        }
+        out = StringIO()
+
+        with django_assert_num_queries(6):
+            call_command("check_push_receipts", stdout=out)
+        for user in users:
+            user.refresh_from_db()
+
+        assert [user.mobile_token for user in users] == ["ExponentPushToken[0]", "", "ExponentPushToken[2]"]
+        assert PushTicket.objects.filter(status=PushTicketStatus.DELIVERED).count() == 1
+        assert PushTicket.objects.filter(status=PushTicketStatus.PENDING).count() == 1
+        assert out.getvalue().startswith("Checked 3 receipts, pruned 1 mobile tokens.")
+        assert "3 sent, 1 failed, 1 pruned" in out.getvalue()
+
+    def test_expo_sender_with_fake_expo_server(self, settings):
+        server = HTTPServer(("127.0.0.1", 0), FakeExpoHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        settings.PUSH_NOTIFICATIONS_SENDER = "fridger.notifications.senders.ExpoSender"
+        settings.PUSH_NOTIFICATIONS_EXPO_HOST = f"http://127.0.0.1:{server.server_port}"
+        sent = self._enqueue("ExponentPushToken[a]")
+        invalid = self._enqueue("ExponentPushToken[invalid]")
+
+        try:
+            call_command("send_push_notifications", "--once", stdout=StringIO())
+        finally:
+            server.shutdown()
+        sent.refresh_from_db()
+        invalid.refresh_from_db()
+
+        assert sent.status == PushNotificationStatus.SENT
+        assert invalid.status == PushNotificationStatus.FAILED
+        assert invalid.error == "Not a valid token"
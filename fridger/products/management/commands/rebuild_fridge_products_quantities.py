@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from fridger.products.models import FridgeProduct
+
+
+class Command(BaseCommand):
+    help = "Rebuild stored quantities and availability of fridge products from their history."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report products whose stored quantities differ from their history.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            out_of_sync = (
+                FridgeProduct.objects.with_history_quantities()
+                .filter(
+                    ~Q(quantity_base=F("history_quantity_base"))
+                    | ~Q(quantity_used=F("history_quantity_used"))
+                    | ~Q(quantity_wasted=F("history_quantity_wasted"))
+                    | ~Q(quantity_left=F("history_quantity_left"))
+                )
+                .count()
+            )
+            self.stdout.write(f"{out_of_sync} products have quantities out of sync with their history.")
+            return
+
+        with transaction.atomic():
+            updated = FridgeProduct.objects.update_quantities()
+        self.stdout.write(f"Rebuilt quantities of {updated} products.")
@@ -1,8 +1,199 @@
+import datetime
+from decimal import Decimal
+
+from django.apps import apps
 from django.db import models
-from django.db.models import Q
+from django.db.models import (
+    Case,
+    DateField,
+    DecimalField,
+    F,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
 from django.db.models.aggregates import Sum
+from django.db.models.functions import Coalesce, Trunc, TruncDate
+from django.utils import timezone
+
+from fridger.utils.enums import (
+    FridgeProductStatus,
+    QuantityType,
+    ShoppingListProductStatus,
+)
+
+EXPIRED_THRESHOLD = -1
+
+QUANTITY_FIELDS = ("quantity_base", "quantity_used", "quantity_wasted", "quantity_left")
+
+FOOD_STATS_STATUSES = {
+    "eaten": FridgeProductStatus.USED,
+    "wasted": FridgeProductStatus.WASTED,
+}
+# multipliers converting product quantity to the unit of the statistic
+FOOD_STATS_UNITS = {
+    "liters": {QuantityType.ML: Decimal("0.001"), QuantityType.L: 1},
+    "kilograms": {QuantityType.G: Decimal("0.001"), QuantityType.KG: 1},
+    "pieces": {QuantityType.PIECE: 1},
+}
+# quantity types in which history stores base quantities of each statistic unit
+FOOD_STATS_BASE_TYPES = {
+    "liters": QuantityType.L,
+    "kilograms": QuantityType.KG,
+    "pieces": QuantityType.PIECE,
+}
+
+
+def quantity_deltas(status, quantity):
+    """Changes of the stored product quantities caused by history entry with given `status` and `quantity`."""
+    if status == FridgeProductStatus.UNUSED:
+        return {"quantity_base": quantity, "quantity_left": quantity}
+    if status == FridgeProductStatus.USED:
+        return {"quantity_used": quantity, "quantity_left": -quantity}
+    if status == FridgeProductStatus.WASTED:
+        return {"quantity_wasted": quantity, "quantity_left": -quantity}
+    return {}
+
+
+class FridgeProductQuerySet(models.QuerySet):
+    def add_quantities(self, status, quantity):
+        deltas = quantity_deltas(status, quantity)
+        if not deltas:
+            return 0
+        left_delta = deltas["quantity_left"]
+        return self.update(
+            **{field: F(field) + delta for field, delta in deltas.items()},
+            is_available=Case(
+                When(quantity_left__gt=-left_delta, then=Value(True)),
+                default=Value(False),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def with_history_quantities(self):
+        """Annotate quantities summed from the product history, computed with one grouped aggregate."""
+
+        def history_sum(status):
+            return Coalesce(
+                Sum("fridge_product_history__quantity", filter=Q(fridge_product_history__status=status)),
+                Value(0),
+                output_field=DecimalField(),
+            )
+
+        return self.annotate(
+            history_quantity_base=history_sum(FridgeProductStatus.UNUSED),
+            history_quantity_used=history_sum(FridgeProductStatus.USED),
+            history_quantity_wasted=history_sum(FridgeProductStatus.WASTED),
+        ).annotate(
+            history_quantity_left=F("history_quantity_base")
+            - F("history_quantity_used")
+            - F("history_quantity_wasted"),
+        )
+
+    def update_quantities(self):
+        """Rebuild stored quantities and availability of the products from their history."""
+        FridgeProductHistory = apps.get_model("products", "FridgeProductHistory")
+
+        def history_sum(*whens):
+            return Coalesce(
+                Subquery(
+                    FridgeProductHistory.objects.filter(product=OuterRef("pk"))
+                    .order_by()
+                    .values("product")
+                    .annotate(total=Sum(Case(*whens, output_field=DecimalField())))
+                    .values("total")
+                ),
+                Value(0),
+                output_field=DecimalField(),
+            )
+
+        self.update(
+            quantity_base=history_sum(When(status=FridgeProductStatus.UNUSED, then=F("quantity"))),
+            quantity_used=history_sum(When(status=FridgeProductStatus.USED, then=F("quantity"))),
+            quantity_wasted=history_sum(When(status=FridgeProductStatus.WASTED, then=F("quantity"))),
+            quantity_left=history_sum(
+                When(status=FridgeProductStatus.UNUSED, then=F("quantity")),
+                When(status__in=[FridgeProductStatus.USED, FridgeProductStatus.WASTED], then=-F("quantity")),
+            ),
+            updated_at=timezone.now(),
+        )
+        return self.update(is_available=Case(When(quantity_left__gt=0, then=Value(True)), default=Value(False)))
+
+    def expiring(self, today, days):
+        """
+        Available products which expire in less than `days`, or have already expired.
+
+        Annotated with `expiration_threshold`, number of days left until expiration or -1 for all expired products.
+        """
+        return self.filter(is_available=True, expiration_date__lt=today + datetime.timedelta(days=days)).annotate(
+            expiration_threshold=Case(
+                *[
+                    When(expiration_date=today + datetime.timedelta(days=days_left), then=Value(days_left))
+                    for days_left in range(days)
+                ],
+                default=Value(EXPIRED_THRESHOLD),
+                output_field=IntegerField(),
+            )
+        )
+
+
+def _window_filter(field, start_date, end_date):
+    window = Q()
+    if start_date:
+        window &= Q(**{f"{field}__gte": start_date})
+    if end_date:
+        window &= Q(**{f"{field}__lt": end_date})
+    return window
+
+
+def _windows_filter(field, windows):
+    """Rows in any of the windows, so only their ranges are read instead of one range covering all of them."""
+    windows_filter = Q()
+    for start_date, end_date in windows.values():
+        window = _window_filter(field, start_date, end_date)
+        if not window:
+            return Q()
+        windows_filter |= window
+    return windows_filter
 
-from fridger.utils.enums import FridgeProductStatus
+
+def _group_by_window(queryset, aggregates):
+    aliases = {f"stat_{index}": key for index, key in enumerate(aggregates)}
+    results = queryset.aggregate(**{alias: aggregates[key] for alias, key in aliases.items()})
+    stats = {}
+    for alias, (name, stat) in aliases.items():
+        stats.setdefault(name, {})[stat] = results[alias]
+    return stats
+
+
+def base_quantity(quantity_type, quantity):
+    """Quantity converted to the base unit of its quantity type family, as `(base_quantity_type, base_quantity)`."""
+    for unit, multipliers in FOOD_STATS_UNITS.items():
+        if quantity_type in multipliers:
+            return FOOD_STATS_BASE_TYPES[unit], quantity * multipliers[quantity_type]
+    return "", quantity
+
+
+def food_stats_deltas(status, base_quantity_type, base_quantity):
+    """Changes of food statistics caused by history entry, keyed like `food_stats` results."""
+    stat = next((stat for stat, stat_status in FOOD_STATS_STATUSES.items() if stat_status == status), None)
+    if stat is None:
+        return {}
+    for unit, unit_type in FOOD_STATS_BASE_TYPES.items():
+        if base_quantity_type == unit_type:
+            return {f"{stat}_{unit}": base_quantity}
+    return {}
+
+
+def food_stat_sum(stat, unit, window=None):
+    """Sum of base quantities of history entries counted in the `stat` statistic of `unit`."""
+    food_stat_filter = Q(status=FOOD_STATS_STATUSES[stat], base_quantity_type=FOOD_STATS_BASE_TYPES[unit])
+    if window:
+        food_stat_filter &= window
+    return Sum("base_quantity", filter=food_stat_filter)
 
 
 class FridgeProductHistoryQuerySet(models.QuerySet):
@@ -12,3 +203,114 @@ class FridgeProductHistoryQuerySet(models.QuerySet):
             quantity_used=Sum("quantity", filter=Q(status=FridgeProductStatus.USED)),
             quantity_wasted=Sum("quantity", filter=Q(status=FridgeProductStatus.WASTED)),
         )
+
+    def food_stats(self, windows):
+        """
+        Eaten and wasted food of every window in one aggregate.
+
+        `windows` maps window name to its `(start_date, end_date)` range, end exclusive and `None` for unbounded.
+        Result maps window name to its stats.
+        """
+        history = self.filter(_windows_filter("created_at", windows))
+        aggregates = {}
+        for name, (start_date, end_date) in windows.items():
+            window = _window_filter("created_at", start_date, end_date)
+            for stat in FOOD_STATS_STATUSES:
+                for unit in FOOD_STATS_UNITS:
+                    aggregates[(name, f"{stat}_{unit}")] = Coalesce(food_stat_sum(stat, unit, window), Decimal(0))
+        return _group_by_window(history, aggregates)
+
+    def daily_food_stats(self):
+        """Eaten and wasted food of every creator's day, rows of `created_by`, `day` and the statistics."""
+        return (
+            self.filter(created_by__isnull=False, status__in=FOOD_STATS_STATUSES.values())
+            .annotate(day=TruncDate("created_at"))
+            .values("created_by", "day")
+            .annotate(
+                **{
+                    f"{stat}_{unit}": food_stat_sum(stat, unit)
+                    for stat in FOOD_STATS_STATUSES
+                    for unit in FOOD_STATS_UNITS
+                }
+            )
+            .order_by()
+        )
+
+    def food_stats_series(self, bucket, start_date, end_date):
+        """Eaten and wasted food grouped into `bucket` ("day", "week" or "month") periods of the range."""
+        return (
+            self.filter(_window_filter("created_at", start_date, end_date))
+            .annotate(bucket=Trunc("created_at", bucket, output_field=DateField()))
+            .values("bucket")
+            .annotate(
+                **{
+                    f"{stat}_{unit}": Coalesce(food_stat_sum(stat, unit), Decimal(0))
+                    for stat in FOOD_STATS_STATUSES
+                    for unit in FOOD_STATS_UNITS
+                }
+            )
+            .order_by("bucket")
+        )
+
+
+# actions changing status of shopping list product: statuses it can change from, status it changes to and whether
+# the product should be taken by the user
+SHOPPING_LIST_PRODUCT_TRANSITIONS = {
+    "claim": ([ShoppingListProductStatus.FREE], ShoppingListProductStatus.TAKER, False),
+    "mark": ([ShoppingListProductStatus.TAKER], ShoppingListProductStatus.TAKER_MARKED, True),
+    "release": (
+        [ShoppingListProductStatus.TAKER, ShoppingListProductStatus.TAKER_MARKED],
+        ShoppingListProductStatus.FREE,
+        True,
+    ),
+}
+
+
+class ShoppingListProductQuerySet(models.QuerySet):
+    def transition(self, action, user, updated_at=None):
+        """
+        Change status of the products with one conditional update, only products still in expected status change.
+
+        Returns number of changed products, 0 when another user has changed the product first.
+        """
+        from_statuses, status, taken = SHOPPING_LIST_PRODUCT_TRANSITIONS[action]
+        products = self.filter(status__in=from_statuses)
+        if taken:
+            products = products.filter(taken_by=user)
+        return products.update(
+            status=status,
+            taken_by=None if status == ShoppingListProductStatus.FREE else user,
+            updated_at=updated_at or timezone.now(),
+        )
+
+    def money_spent_stats(self, windows):
+        """Money spent on bought products of every window in one aggregate, see `food_stats`."""
+        products = self.filter(
+            _windows_filter("updated_at", windows),
+            status=ShoppingListProductStatus.BUYER,
+        )
+        aggregates = {
+            (name, "money_spent"): Sum("price", filter=_window_filter("updated_at", start_date, end_date) or None)
+            for name, (start_date, end_date) in windows.items()
+        }
+        return _group_by_window(products, aggregates)
+
+    def daily_money_spent(self):
+        """Money spent on bought products of every buyer's day, rows of `taken_by`, `day` and `money_spent`."""
+        return (
+            self.filter(status=ShoppingListProductStatus.BUYER, taken_by__isnull=False, price__isnull=False)
+            .annotate(day=TruncDate("updated_at"))
+            .values("taken_by", "day")
+            .annotate(money_spent=Sum("price"))
+            .order_by()
+        )
+
+    def money_spent_series(self, bucket, start_date, end_date):
+        """Money spent grouped into `bucket` periods of the range, see `food_stats_series`."""
+        return (
+            self.filter(_window_filter("updated_at", start_date, end_date), status=ShoppingListProductStatus.BUYER)
+            .annotate(bucket=Trunc("updated_at", bucket, output_field=DateField()))
+            .values("bucket")
+            .annotate(money_spent=Sum("price"))
+            .order_by("bucket")
+        )
@@ -0,0 +1,50 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:22
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+
+def fill_quantities(apps, schema_editor):
+    FridgeProduct = apps.get_model('products', 'FridgeProduct')
+    for product in FridgeProduct.objects.iterator():
+        quantities = product.fridge_product_history.aggregate(
+            quantity_base=Sum('quantity', filter=Q(status='UNUSED')),
+            quantity_used=Sum('quantity', filter=Q(status='USED')),
+            quantity_wasted=Sum('quantity', filter=Q(status='WASTED')),
+        )
+        product.quantity_base = quantities['quantity_base'] or Decimal(0)
+        product.quantity_used = quantities['quantity_used'] or Decimal(0)
+        product.quantity_wasted = quantities['quantity_wasted'] or Decimal(0)
+        product.quantity_left = product.quantity_base - product.quantity_used - product.quantity_wasted
+        product.save(update_fields=['quantity_base', 'quantity_used', 'quantity_wasted', 'quantity_left'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_fridgeproduct_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fridgeproduct',
+            name='quantity_base',
+            field=models.DecimalField(decimal_places=3, default=Decimal('0'), editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='fridgeproduct',
+            name='quantity_left',
+            field=models.DecimalField(decimal_places=3, default=Decimal('0'), editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='fridgeproduct',
+            name='quantity_used',
+            field=models.DecimalField(decimal_places=3, default=Decimal('0'), editable=False, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='fridgeproduct',
+            name='quantity_wasted',
+            field=models.DecimalField(decimal_places=3, default=Decimal('0'), editable=False, max_digits=12),
+        ),
+        migrations.RunPython(fill_quantities, migrations.RunPython.noop),
+    ]
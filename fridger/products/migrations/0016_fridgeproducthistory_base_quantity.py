@@ -0,0 +1,48 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:32
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, Value
+
+# quantity type: (base quantity type, multiplier)
+BASE_QUANTITIES = {
+    'ML': ('L', Decimal('0.001')),
+    'L': ('L', Decimal('1')),
+    'G': ('KG', Decimal('0.001')),
+    'KG': ('KG', Decimal('1')),
+    'PIECE': ('PIECE', Decimal('1')),
+}
+
+
+def fill_base_quantities(apps, schema_editor):
+    FridgeProductHistory = apps.get_model('products', 'FridgeProductHistory')
+    for quantity_type, (base_quantity_type, multiplier) in BASE_QUANTITIES.items():
+        FridgeProductHistory.objects.filter(product__quantity_type=quantity_type).update(
+            base_quantity_type=base_quantity_type,
+            base_quantity=F('quantity') * Value(multiplier),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_fridgeproduct_quantities'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fridgeproducthistory',
+            name='base_quantity',
+            field=models.DecimalField(decimal_places=6, default=Decimal('0'), editable=False, max_digits=16),
+        ),
+        migrations.AddField(
+            model_name='fridgeproducthistory',
+            name='base_quantity_type',
+            field=models.CharField(blank=True, choices=[('PIECE', 'Piece'), ('ML', 'Ml'), ('L', 'L'), ('G', 'G'), ('KG', 'Kg')], editable=False, max_length=5),
+        ),
+        migrations.RunPython(fill_base_quantities, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='fridgeproducthistory',
+            index=models.Index(fields=['created_by', 'created_at'], include=('status', 'base_quantity_type', 'base_quantity'), name='product_history_stats_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0016_fridgeproducthistory_base_quantity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fridgeproduct',
+            index=models.Index(fields=['fridge', 'is_available', 'created_at', 'id'], name='fridge_product_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppinglistproduct',
+            index=models.Index(fields=['shopping_list', 'created_at', 'id'], name='list_product_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0017_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fridgeproduct',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='fridgeproduct',
+            index=models.Index(fields=['fridge', 'updated_at'], name='fridge_product_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fridgeproducthistory',
+            index=models.Index(fields=['product', 'created_at'], name='product_history_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='shoppinglistproduct',
+            index=models.Index(fields=['shopping_list', 'updated_at'], name='list_product_sync_idx'),
+        ),
+    ]
@@ -1,15 +1,31 @@
+from collections import defaultdict
 from decimal import Decimal
 
+from django.apps import apps
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import signals
+from django.dispatch import receiver
+from django.utils import timezone
 
 from fridger.fridges.models import Fridge
-from fridger.products.managers import FridgeProductHistoryQuerySet
+from fridger.products.managers import (
+    QUANTITY_FIELDS,
+    SHOPPING_LIST_PRODUCT_TRANSITIONS,
+    FridgeProductHistoryQuerySet,
+    FridgeProductQuerySet,
+    ShoppingListProductQuerySet,
+    base_quantity,
+    food_stats_deltas,
+)
+from fridger.shopping_lists.managers import status_count_deltas
 from fridger.shopping_lists.models import ShoppingList
+from fridger.users.models import UserDailyStatistics
 from fridger.utils.enums import (
     FridgeProductStatus,
     QuantityType,
     ShoppingListProductStatus,
+    SyncModel,
 )
 from fridger.utils.models import BaseModel
 
@@ -19,6 +35,7 @@ User = get_user_model()
 class FridgeProduct(BaseModel):
     fridge = models.ForeignKey(Fridge, related_name="fridge_product", on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     name = models.CharField(max_length=60)
     producer_name = models.CharField(max_length=60, blank=True)
@@ -29,25 +46,27 @@ class FridgeProduct(BaseModel):
     quantity_type = models.CharField(choices=QuantityType.choices, max_length=5)
     is_available = models.BooleanField(default=True)
 
-    @property
-    def quantity_base(self) -> Decimal:
-        return self.fridge_product_history.quantities()["quantity_base"] or Decimal(0)
+    quantity_base = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal(0), editable=False)
+    quantity_used = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal(0), editable=False)
+    quantity_wasted = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal(0), editable=False)
+    quantity_left = models.DecimalField(max_digits=12, decimal_places=3, default=Decimal(0), editable=False)
 
-    @property
-    def quantity_left(self) -> Decimal:
-        return self.quantity_base - self.quantity_used - self.quantity_wasted
+    objects = FridgeProductQuerySet.as_manager()
 
-    @property
-    def quantity_used(self) -> Decimal:
-        return self.fridge_product_history.quantities()["quantity_used"] or Decimal(0)
+    class Meta:
+        indexes = [
+            # available products of the fridge in keyset pagination order
+            models.Index(fields=["fridge", "is_available", "created_at", "id"], name="fridge_product_keyset_idx"),
+            models.Index(fields=["fridge", "updated_at"], name="fridge_product_sync_idx"),
+        ]
 
-    @property
-    def quantity_wasted(self) -> Decimal:
-        return self.fridge_product_history.quantities()["quantity_wasted"] or Decimal(0)
+    def add_quantities(self, status, quantity):
+        FridgeProduct.objects.filter(pk=self.pk).add_quantities(status, quantity)
+        self.refresh_from_db(fields=[*QUANTITY_FIELDS, "is_available", "updated_at"])
 
-    def update_is_available(self):
-        self.is_available = self.quantity_left > 0
-        self.save()
+    def update_quantities(self):
+        FridgeProduct.objects.filter(pk=self.pk).update_quantities()
+        self.refresh_from_db(fields=[*QUANTITY_FIELDS, "is_available", "updated_at"])
 
 
 class FridgeProductHistory(BaseModel):
@@ -57,17 +76,61 @@ class FridgeProductHistory(BaseModel):
     status = models.CharField(choices=FridgeProductStatus.choices, default=FridgeProductStatus.UNUSED, max_length=9)
     created_at = models.DateTimeField(auto_now_add=True)
     quantity = models.DecimalField(max_digits=10, decimal_places=3)
+    # quantity converted to liters, kilograms or pieces, summed by statistics without joining the product
+    base_quantity_type = models.CharField(choices=QuantityType.choices, max_length=5, blank=True, editable=False)
+    base_quantity = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0), editable=False)
 
     objects = FridgeProductHistoryQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["created_by", "created_at"],
+                include=["status", "base_quantity_type", "base_quantity"],
+                name="product_history_stats_idx",
+            ),
+            models.Index(fields=["product", "created_at"], name="product_history_sync_idx"),
+        ]
+
+    @classmethod
+    def update_daily_statistics(cls, product_history, sign=1):
+        """Add food eaten or wasted in `product_history` to daily statistics of its creators."""
+        deltas = defaultdict(lambda: defaultdict(Decimal))
+        for history in product_history:
+            day_deltas = deltas[(history.created_by_id, timezone.localdate(history.created_at))]
+            for field, delta in food_stats_deltas(
+                history.status, history.base_quantity_type, history.base_quantity
+            ).items():
+                day_deltas[field] += sign * delta
+        for (user_id, day), day_deltas in deltas.items():
+            UserDailyStatistics.objects.add(user_id, day, **day_deltas)
+
+    def set_base_quantity(self):
+        self.base_quantity_type, self.base_quantity = base_quantity(self.product.quantity_type, self.quantity)
+
     def save(self, *args, **kwargs):
-        instance = super().save(*args, **kwargs)
-        self.product.update_is_available()
+        adding = self._state.adding
+        self.set_base_quantity()
+        with transaction.atomic():
+            instance = super().save(*args, **kwargs)
+            if adding:
+                self.product.add_quantities(self.status, self.quantity)
+                FridgeProductHistory.update_daily_statistics([self])
+            else:
+                self.product.update_quantities()
         return instance
 
     def delete(self, *args, **kwargs):
-        instance = super().delete(*args, **kwargs)
-        self.product.update_is_available()
+        Tombstone = apps.get_model("sync", "Tombstone")
+        history_id = self.id
+        with transaction.atomic():
+            instance = super().delete(*args, **kwargs)
+            self.product.add_quantities(self.status, -self.quantity)
+            FridgeProductHistory.update_daily_statistics([self], sign=-1)
+            # history deleted with its product gets no tombstone of its own, the product tombstone covers it
+            Tombstone.objects.create(
+                model=SyncModel.FRIDGE_PRODUCT_HISTORY, object_id=history_id, fridge_id=self.product.fridge_id
+            )
         return instance
 
 
@@ -90,12 +153,125 @@ class ShoppingListProduct(BaseModel):
     quantity_type = models.CharField(choices=QuantityType.choices, max_length=5)
     quantity = models.DecimalField(max_digits=10, decimal_places=3)
 
+    objects = ShoppingListProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["shopping_list", "created_at", "id"], name="list_product_keyset_idx"),
+            models.Index(fields=["shopping_list", "updated_at"], name="list_product_sync_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if {"status", "taken_by_id", "price", "updated_at"}.issubset(field_names):
+            instance._loaded_money_spent = instance.money_spent
+        if {"shopping_list_id", "status"}.issubset(field_names):
+            instance._loaded_counted = (instance.shopping_list_id, instance.status)
+        return instance
+
+    @property
+    def money_spent(self):
+        """`(user_id, day, price)` the product adds to daily statistics, `None` if it is not bought."""
+        if self.status == ShoppingListProductStatus.BUYER and self.taken_by_id and self.price:
+            return self.taken_by_id, timezone.localdate(self.updated_at), self.price
+        return None
+
+    @classmethod
+    def update_daily_statistics(cls, products, deleted=False):
+        """Move money spent on `products` in daily statistics from their loaded to their current state."""
+        deltas = defaultdict(Decimal)
+        for product in products:
+            if deleted:
+                loaded_money_spent = getattr(product, "_loaded_money_spent", product.money_spent)
+                money_spent = None
+            else:
+                loaded_money_spent = getattr(product, "_loaded_money_spent", None)
+                money_spent = product.money_spent
+            if loaded_money_spent == money_spent:
+                continue
+            if loaded_money_spent:
+                user_id, day, price = loaded_money_spent
+                deltas[(user_id, day)] -= price
+            if money_spent:
+                user_id, day, price = money_spent
+                deltas[(user_id, day)] += price
+            product._loaded_money_spent = money_spent
+        for (user_id, day), delta in deltas.items():
+            UserDailyStatistics.objects.add(user_id, day, money_spent=delta)
+
+    @classmethod
+    def update_shopping_lists_counts(cls, products, adding=False, deleted=False):
+        """Move `products` in counters of their shopping lists from their loaded to their current state."""
+        deltas = defaultdict(lambda: defaultdict(int))
+        recount = set()
+        for product in products:
+            if adding:
+                loaded_counted = None
+            elif hasattr(product, "_loaded_counted"):
+                loaded_counted = product._loaded_counted
+            else:
+                # loaded without its status, previous state is unknown
+                recount.add(product.shopping_list_id)
+                continue
+            counted = None if deleted else (product.shopping_list_id, product.status)
+            if loaded_counted == counted:
+                continue
+            if loaded_counted:
+                shopping_list_id, status = loaded_counted
+                for field, delta in status_count_deltas(status, sign=-1).items():
+                    deltas[shopping_list_id][field] += delta
+            if counted:
+                shopping_list_id, status = counted
+                for field, delta in status_count_deltas(status).items():
+                    deltas[shopping_list_id][field] += delta
+            product._loaded_counted = counted
+        for shopping_list_id, list_deltas in deltas.items():
+            list_deltas = {field: delta for field, delta in list_deltas.items() if delta}
+            if list_deltas:
+                ShoppingList.objects.filter(pk=shopping_list_id).add_counts(**list_deltas)
+        if recount:
+            ShoppingList.objects.filter(pk__in=recount).update_counts()
+
+    def transition(self, action, user):
+        """Change status with compare-and-set, returns `False` when another user has changed the product first."""
+        from_statuses, status, _ = SHOPPING_LIST_PRODUCT_TRANSITIONS[action]
+        updated_at = timezone.now()
+        with transaction.atomic():
+            if not ShoppingListProduct.objects.filter(pk=self.pk).transition(action, user, updated_at):
+                return False
+            self.status = status
+            self.taken_by = None if status == ShoppingListProductStatus.FREE else user
+            self.updated_at = updated_at
+            # all statuses a transition changes from share one counter
+            self._loaded_counted = (self.shopping_list_id, from_statuses[0])
+            ShoppingListProduct.update_shopping_lists_counts([self])
+        return True
+
     def save(self, *args, **kwargs):
-        instance = super().save(*args, **kwargs)
-        self.shopping_list.update_is_archived()
+        adding = self._state.adding
+        with transaction.atomic():
+            instance = super().save(*args, **kwargs)
+            ShoppingListProduct.update_daily_statistics([self])
+            ShoppingListProduct.update_shopping_lists_counts([self], adding=adding)
         return instance
 
     def delete(self, *args, **kwargs):
-        instance = super().delete(*args, **kwargs)
-        self.shopping_list.update_is_archived()
+        with transaction.atomic():
+            instance = super().delete(*args, **kwargs)
+            ShoppingListProduct.update_daily_statistics([self], deleted=True)
+            ShoppingListProduct.update_shopping_lists_counts([self], deleted=True)
         return instance
+
+
+# rows deleted in cascade skip the model delete(), their statistics are subtracted with one update per day instead
+@receiver(signals.pre_delete, sender=FridgeProduct)
+def fridge_product_pre_delete_signal(sender, instance, **kwargs):
+    for row in FridgeProductHistory.objects.filter(product=instance).daily_food_stats():
+        UserDailyStatistics.objects.subtract(row.pop("created_by"), row.pop("day"), **row)
+
+
+@receiver(signals.pre_delete, sender=ShoppingList)
+def shopping_list_pre_delete_signal(sender, instance, **kwargs):
+    for row in ShoppingListProduct.objects.filter(shopping_list=instance).daily_money_spent():
+        UserDailyStatistics.objects.subtract(row["taken_by"], row["day"], money_spent=row["money_spent"])
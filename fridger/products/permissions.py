@@ -1,23 +1,13 @@
 from rest_framework import permissions
 
-from fridger.fridges.models import FridgeOwnership
-from fridger.shopping_lists.models import ShoppingListOwnership
-from fridger.utils.enums import UserPermission
+from fridger.utils.ownerships import WRITE_PERMISSIONS, get_ownerships
 
 
 class HasFridgeProductWritePermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = FridgeOwnership.objects.get(user=request.user, fridge=obj.fridge)
-        except FridgeOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR, UserPermission.WRITE]
+        return get_ownerships(request).fridge_permission(obj.fridge_id) in WRITE_PERMISSIONS
 
 
 class HasShoppingListProductWritePermissions(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = ShoppingListOwnership.objects.get(user=request.user, shopping_list=obj.shopping_list)
-        except ShoppingListOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR, UserPermission.WRITE]
+        return get_ownerships(request).shopping_list_permission(obj.shopping_list_id) in WRITE_PERMISSIONS
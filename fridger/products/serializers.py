@@ -1,10 +1,10 @@
+from django.db import transaction
 from django.utils.translation import gettext as _
 from rest_framework import exceptions, serializers
 
-from fridger.fridges.models import FridgeOwnership
-from fridger.shopping_lists.models import ShoppingListOwnership
 from fridger.users.serializers import BasicDisplayUserSerializer
-from fridger.utils.enums import ShoppingListProductStatus, UserPermission
+from fridger.utils.enums import ShoppingListProductStatus
+from fridger.utils.ownerships import WRITE_PERMISSIONS, get_ownerships
 
 from .models import FridgeProduct, FridgeProductHistory, ShoppingListProduct
 
@@ -13,6 +13,22 @@ from .models import FridgeProduct, FridgeProductHistory, ShoppingListProduct
 ###################
 
 
+class QuantityField(serializers.DecimalField):
+    """Prefers `history_<field>` annotation of `FridgeProductQuerySet.with_history_quantities` over stored value."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("max_digits", 12)
+        kwargs.setdefault("decimal_places", 3)
+        kwargs.setdefault("read_only", True)
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        annotation = f"history_{self.source}"
+        if hasattr(instance, annotation):
+            return getattr(instance, annotation)
+        return super().get_attribute(instance)
+
+
 class NestedFridgeProductHistory(serializers.ModelSerializer):
     class Meta:
         model = FridgeProductHistory
@@ -54,14 +70,12 @@ class CreateFridgeProductSerializer(serializers.ModelSerializer):
         return product
 
     def validate(self, attrs):
-        request_user = self.context.get("request").user
         fridge = attrs.get("fridge")
-        try:
-            ownership = request_user.fridge_ownership.get(fridge=fridge)
-        except FridgeOwnership.DoesNotExist:
+        permission = get_ownerships(self.context.get("request")).fridge_permission(fridge.id)
+        if permission is None:
             raise exceptions.PermissionDenied(_("User does not belong to this fridge."))
 
-        if ownership.permission not in [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]:
+        if permission not in WRITE_PERMISSIONS:
             raise exceptions.PermissionDenied(_("User does not have permission to add product to this fridge."))
 
         return attrs
@@ -90,6 +104,9 @@ class PartialUpdateFridgeProductSerializer(serializers.ModelSerializer):
 
 
 class ListFridgeProductSerializer(serializers.ModelSerializer):
+    quantity_base = QuantityField()
+    quantity_left = QuantityField()
+
     class Meta:
         model = FridgeProduct
         fields = (
@@ -124,19 +141,80 @@ class CreateFridgeProductHistorySerializer(serializers.ModelSerializer):
         )
 
     def validate(self, attrs):
-        request_user = self.context.get("request").user
         product = attrs.get("product")
-        try:
-            ownership = request_user.fridge_ownership.get(fridge=product.fridge)
-        except FridgeOwnership.DoesNotExist:
+        permission = get_ownerships(self.context.get("request")).fridge_permission(product.fridge_id)
+        if permission is None:
             raise exceptions.PermissionDenied(_("User does not belong to this fridge."))
 
-        if ownership.permission not in [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]:
+        if permission not in WRITE_PERMISSIONS:
             raise exceptions.PermissionDenied(_("User does not have permission to add product to this fridge."))
 
         return attrs
 
 
+class BulkCreateFridgeProductHistoryListSerializer(serializers.ListSerializer):
+    max_length = 500
+
+    def validate(self, attrs):
+        if len(attrs) > self.max_length:
+            raise serializers.ValidationError(
+                _("Ensure there are no more than %(max_length)s history entries.") % {"max_length": self.max_length}
+            )
+
+        products_ids = {item["product_id"] for item in attrs}
+        self.products = FridgeProduct.objects.only("id", "fridge", "quantity_type").in_bulk(products_ids)
+        if missing_ids := products_ids - self.products.keys():
+            raise serializers.ValidationError(
+                _("Products %(products_ids)s do not exist.")
+                % {"products_ids": ", ".join(str(product_id) for product_id in missing_ids)}
+            )
+
+        ownerships = get_ownerships(self.context.get("request"))
+        for fridge_id in {product.fridge_id for product in self.products.values()}:
+            permission = ownerships.fridge_permission(fridge_id)
+            if permission is None:
+                raise exceptions.PermissionDenied(_("User does not belong to this fridge."))
+            if permission not in WRITE_PERMISSIONS:
+                raise exceptions.PermissionDenied(_("User does not have permission to add product to this fridge."))
+
+        return attrs
+
+    def create(self, validated_data):
+        product_history = []
+        for item in validated_data:
+            history = FridgeProductHistory(**item)
+            history.product = self.products[item["product_id"]]
+            history.set_base_quantity()
+            product_history.append(history)
+
+        with transaction.atomic():
+            FridgeProductHistory.objects.bulk_create(product_history)
+            FridgeProduct.objects.filter(id__in=self.products.keys()).update_quantities()
+            FridgeProductHistory.update_daily_statistics(product_history)
+        return product_history
+
+
+class BulkCreateFridgeProductHistorySerializer(serializers.ModelSerializer):
+    product = serializers.UUIDField(source="product_id")
+
+    class Meta:
+        model = FridgeProductHistory
+        list_serializer_class = BulkCreateFridgeProductHistoryListSerializer
+        fields = (
+            "id",
+            "created_by",
+            "product",
+            "status",
+            "created_at",
+            "quantity",
+        )
+        read_only_fields = (
+            "id",
+            "created_at",
+            "created_by",
+        )
+
+
 ###########################
 # SHOPPING LISTS PRODUCTS #
 ###########################
@@ -164,14 +242,12 @@ class CreateShoppingListProductSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, attrs):
-        request_user = self.context.get("request").user
         shopping_list = attrs.get("shopping_list")
-        try:
-            ownership = request_user.shopping_list_ownership.get(shopping_list=shopping_list)
-        except ShoppingListOwnership.DoesNotExist:
+        permission = get_ownerships(self.context.get("request")).shopping_list_permission(shopping_list.id)
+        if permission is None:
             raise exceptions.PermissionDenied(_("User does not belong to this shopping list."))
 
-        if ownership.permission not in [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]:
+        if permission not in WRITE_PERMISSIONS:
             raise exceptions.PermissionDenied(_("User does not have permission to add product to this shopping list."))
 
         return attrs
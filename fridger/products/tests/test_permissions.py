@@ -247,3 +247,19 @@ class TestFridgeProductHistoryPemissions:
         response = client.post(self.url, data=data)
 
         assert response.status_code == 201
+
+    def test_bulk_create_product_history_user_read_no_access(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        admin_fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.ADMIN).fridge
+        read_fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.READ).fridge
+        products = [
+            baker.make("products.FridgeProduct", fridge=admin_fridge),
+            baker.make("products.FridgeProduct", fridge=read_fridge),
+        ]
+        data = [
+            {"product": str(product.id), "status": FridgeProductStatus.USED, "quantity": "2.00"} for product in products
+        ]
+        response = client.post(reverse("fridge-history-product-bulk"), data=data, format="json")
+
+        assert response.status_code == 403
@@ -1,9 +1,29 @@
+import base64
+import json
 from decimal import Decimal
+from io import StringIO
 
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from model_bakery import baker
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
 
-from fridger.utils.enums import FridgeProductStatus
+from fridger.products.models import (
+    FridgeProduct,
+    FridgeProductHistory,
+    ShoppingListProduct,
+)
+from fridger.products.serializers import ListFridgeProductSerializer
+from fridger.utils.enums import (
+    FridgeProductStatus,
+    QuantityType,
+    ShoppingListProductStatus,
+    UserPermission,
+)
 
 
 @pytest.mark.django_db
@@ -145,3 +165,273 @@ class TestFridgeProductModels:
         )
 
         assert not self.product.is_available
+
+    def test_fridge_product_quantities_after_history_delete(self):
+        baker.make(
+            "products.FridgeProductHistory",
+            product=self.product,
+            status=FridgeProductStatus.UNUSED,
+            quantity=Decimal(5),
+        )
+        history = baker.make(
+            "products.FridgeProductHistory",
+            product=self.product,
+            status=FridgeProductStatus.USED,
+            quantity=Decimal(5),
+        )
+        assert not self.product.is_available
+
+        history.delete()
+
+        assert self.product.quantity_used == 0
+        assert self.product.quantity_left == 5
+        assert self.product.is_available
+
+    def test_rebuild_fridge_products_quantities(self):
+        baker.make(
+            "products.FridgeProductHistory",
+            product=self.product,
+            status=FridgeProductStatus.UNUSED,
+            quantity=Decimal(10),
+        )
+        baker.make(
+            "products.FridgeProductHistory",
+            product=self.product,
+            status=FridgeProductStatus.WASTED,
+            quantity=Decimal(3),
+        )
+        FridgeProduct.objects.update(quantity_base=0, quantity_wasted=0, quantity_left=0, is_available=False)
+
+        call_command("rebuild_fridge_products_quantities", stdout=StringIO())
+        self.product.refresh_from_db()
+
+        assert self.product.quantity_base == 10
+        assert self.product.quantity_wasted == 3
+        assert self.product.quantity_left == 7
+        assert self.product.is_available
+
+    def test_check_fridge_products_quantities(self):
+        baker.make(
+            "products.FridgeProductHistory",
+            product=self.product,
+            status=FridgeProductStatus.UNUSED,
+            quantity=Decimal(10),
+        )
+        FridgeProduct.objects.update(quantity_left=0)
+        out = StringIO()
+
+        call_command("rebuild_fridge_products_quantities", "--check", stdout=out)
+
+        assert out.getvalue().startswith("1 products")
+
+    def test_fridge_product_history_stores_base_quantity(self):
+        product = baker.make("products.FridgeProduct", quantity_type=QuantityType.G)
+
+        history = baker.make(
+            "products.FridgeProductHistory",
+            product=product,
+            status=FridgeProductStatus.USED,
+            quantity=Decimal(250),
+        )
+        history.refresh_from_db()
+
+        assert history.base_quantity_type == QuantityType.KG
+        assert history.base_quantity == Decimal("0.25")
+
+
+@pytest.mark.django_db
+class TestFridgeProductViews:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.WRITE).fridge
+
+    def test_list_fridge_products_quantities(self, django_assert_num_queries):
+        products = baker.make("products.FridgeProduct", fridge=self.fridge, _quantity=5)
+        for product in products:
+            baker.make(
+                "products.FridgeProductHistory",
+                product=product,
+                status=FridgeProductStatus.UNUSED,
+                quantity=Decimal(4),
+            )
+            baker.make(
+                "products.FridgeProductHistory",
+                product=product,
+                status=FridgeProductStatus.USED,
+                quantity=Decimal(1),
+            )
+
+        with django_assert_num_queries(1):
+            response = self.client.get(reverse("fridge-product-list"), {"fridge": self.fridge.id})
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert len(json_response) == 5
+        assert all(product["quantity_base"] == "4.000" for product in json_response)
+        assert all(product["quantity_left"] == "3.000" for product in json_response)
+
+    def test_list_fridge_products_reads_history_quantities(self):
+        product = baker.make("products.FridgeProduct", fridge=self.fridge)
+        baker.make(
+            "products.FridgeProductHistory",
+            product=product,
+            status=FridgeProductStatus.UNUSED,
+            quantity=Decimal(6),
+        )
+        baker.make(
+            "products.FridgeProductHistory",
+            product=product,
+            status=FridgeProductStatus.WASTED,
+            quantity=Decimal(2),
+        )
+        FridgeProduct.objects.update(quantity_base=0, quantity_left=0)
+
+        products = FridgeProduct.objects.filter(is_available=True).with_history_quantities()
+        data = ListFridgeProductSerializer(products, many=True).data
+
+        assert data[0]["quantity_base"] == "6.000"
+        assert data[0]["quantity_left"] == "4.000"
+
+    def test_list_fridge_products_pages(self):
+        products = baker.make("products.FridgeProduct", fridge=self.fridge, _quantity=5)
+        # products created at the same moment are ordered by id
+        FridgeProduct.objects.filter(id__in=[product.id for product in products[:3]]).update(created_at=timezone.now())
+
+        ids = []
+        url = reverse("fridge-product-list")
+        params = {"fridge": self.fridge.id, "page_size": 2}
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url, params)
+            json_response = response.json()
+            assert response.status_code == 200
+            assert len(json_response["results"]) <= 2
+            assert len(context.captured_queries) == 1
+            assert "COUNT(" not in context.captured_queries[0]["sql"]
+            assert "OFFSET" not in context.captured_queries[0]["sql"]
+            ids += [product["id"] for product in json_response["results"]]
+            url, params = json_response["next"], None
+
+        expected = FridgeProduct.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        assert ids == [str(id) for id in expected]
+
+    def test_list_fridge_products_without_page_params_is_not_paginated(self):
+        baker.make("products.FridgeProduct", fridge=self.fridge, _quantity=3)
+
+        response = self.client.get(reverse("fridge-product-list"), {"fridge": self.fridge.id})
+
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+
+    def test_list_fridge_products_invalid_cursor(self):
+        response = self.client.get(reverse("fridge-product-list"), {"fridge": self.fridge.id, "cursor": "invalid"})
+
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize("id", ["x", 1, ["x"], None])
+    def test_list_fridge_products_tampered_cursor(self, id):
+        cursor = base64.urlsafe_b64encode(json.dumps(["2020-01-01T00:00:00+00:00", id]).encode()).decode()
+
+        response = self.client.get(reverse("fridge-product-list"), {"fridge": self.fridge.id, "cursor": cursor})
+
+        assert response.status_code == 404
+
+    def test_list_fridge_products_pages_reject_ordering(self):
+        response = self.client.get(
+            reverse("fridge-product-list"), {"fridge": self.fridge.id, "page_size": 2, "ordering": "name"}
+        )
+
+        assert response.status_code == 400
+
+    def test_bulk_create_fridge_product_history(self, django_assert_max_num_queries):
+        products = baker.make("products.FridgeProduct", fridge=self.fridge, _quantity=3)
+        for product in products:
+            baker.make(
+                "products.FridgeProductHistory",
+                product=product,
+                status=FridgeProductStatus.UNUSED,
+                quantity=Decimal(2),
+            )
+        data = [
+            {"product": str(product.id), "status": status, "quantity": "1.00"}
+            for product in products
+            for status in [FridgeProductStatus.USED, FridgeProductStatus.WASTED]
+        ]
+
+        with django_assert_max_num_queries(11):
+            response = self.client.post(reverse("fridge-history-product-bulk"), data=data, format="json")
+
+        assert response.status_code == 201
+        assert len(response.json()) == 6
+        assert FridgeProductHistory.objects.filter(created_by=self.user).count() == 6
+        assert not FridgeProduct.objects.filter(is_available=True).exists()
+        assert all(product.quantity_left == 0 for product in FridgeProduct.objects.all())
+
+
+@pytest.mark.django_db
+class TestShoppingListProductViews:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = baker.make("users.User")
+        self.other_user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.shopping_list = baker.make(
+            "shopping_lists.ShoppingListOwnership", user=self.user, permission=UserPermission.WRITE
+        ).shopping_list
+        self.product = baker.make("products.ShoppingListProduct", shopping_list=self.shopping_list)
+
+    def _url(self, action):
+        return reverse(f"shopping-list-product-{action}", args=[self.product.id])
+
+    def test_claim_shopping_list_product(self, django_assert_num_queries):
+        # product, ownerships, compare-and-set and counters update, with savepoint queries of the test transaction
+        with django_assert_num_queries(6):
+            response = self.client.post(self._url("claim"))
+
+        self.product.refresh_from_db()
+        assert response.status_code == 200
+        assert response.json()["status"] == ShoppingListProductStatus.TAKER
+        assert self.product.status == ShoppingListProductStatus.TAKER
+        assert self.product.taken_by == self.user
+
+    def test_claim_shopping_list_product_taken_by_other_user(self):
+        ShoppingListProduct.objects.filter(id=self.product.id).update(
+            status=ShoppingListProductStatus.TAKER, taken_by=self.other_user
+        )
+
+        response = self.client.post(self._url("claim"))
+
+        self.product.refresh_from_db()
+        assert response.status_code == 409
+        assert self.product.taken_by == self.other_user
+
+    def test_mark_and_release_shopping_list_product(self):
+        self.client.post(self._url("claim"))
+
+        assert self.client.post(self._url("mark")).json()["status"] == ShoppingListProductStatus.TAKER_MARKED
+        response = self.client.post(self._url("release"))
+
+        self.product.refresh_from_db()
+        assert response.json()["taken_by"] is None
+        assert self.product.status == ShoppingListProductStatus.FREE
+        assert self.product.taken_by is None
+
+    def test_release_shopping_list_product_of_other_user(self):
+        ShoppingListProduct.objects.filter(id=self.product.id).update(
+            status=ShoppingListProductStatus.TAKER, taken_by=self.other_user
+        )
+
+        response = self.client.post(self._url("release"))
+
+        assert response.status_code == 409
+
+    def test_claim_shopping_list_product_updates_counters(self):
+        self.client.post(self._url("claim"))
+
+        self.shopping_list.refresh_from_db()
+        assert self.shopping_list.free_products_count == 0
+        assert self.shopping_list.taken_products_count == 1
@@ -1,13 +1,21 @@
+from django.utils.translation import gettext as _
 from django_filters import rest_framework as django_filters
-from rest_framework import filters, mixins, viewsets
+from drf_spectacular.utils import extend_schema
+from rest_framework import filters, mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from fridger.utils.pagination import KeysetPagination
 
 from .filters import FridgeProductFilter
+from .managers import SHOPPING_LIST_PRODUCT_TRANSITIONS
 from .models import FridgeProduct, FridgeProductHistory, ShoppingListProduct
 from .permissions import (
     HasFridgeProductWritePermissions,
     HasShoppingListProductWritePermissions,
 )
 from .serializers import (
+    BulkCreateFridgeProductHistorySerializer,
     CreateFridgeProductHistorySerializer,
     CreateFridgeProductSerializer,
     CreateShoppingListProductSerializer,
@@ -31,6 +39,7 @@ class FridgeProductViewSet(
 ):
     http_method_names = ("get", "post", "patch", "delete")
     queryset = FridgeProduct.objects.all()
+    pagination_class = KeysetPagination
 
     filter_backends = (django_filters.DjangoFilterBackend, filters.OrderingFilter)
     filterset_class = FridgeProductFilter
@@ -71,9 +80,23 @@ class FridgeProductHistoryViewSet(viewsets.ModelViewSet):
     queryset = FridgeProductHistory.objects.all()
     serializer_class = CreateFridgeProductHistorySerializer
 
+    def get_serializer_class(self):
+        if self.action == "bulk":
+            return BulkCreateFridgeProductHistorySerializer
+        return super().get_serializer_class()
+
     def perform_create(self, serializer):
         serializer.save(created_by=self.request.user)
 
+    @extend_schema(request=BulkCreateFridgeProductHistorySerializer(many=True))
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """Add many product history entries at once."""
+        serializer = self.get_serializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
 
 ###########################
 # SHOPPING LISTS PRODUCTS #
@@ -94,12 +117,38 @@ class ShoppingListProductViewSet(
             return CreateShoppingListProductSerializer
         elif self.action == "partial_update":
             return PartialUpdateShoppingListProductSerializer
-        elif self.action == "list":
+        elif self.action == "list" or self.action in SHOPPING_LIST_PRODUCT_TRANSITIONS:
             return ListShoppingListProductSerializer
         return super().get_serializer_class()
 
     def get_permissions(self):
         permission_classes = self.permission_classes
-        if self.action in ["partial_update", "destroy"]:
+        if self.action in ["partial_update", "destroy", *SHOPPING_LIST_PRODUCT_TRANSITIONS]:
             permission_classes = [HasShoppingListProductWritePermissions]
         return [permission() for permission in permission_classes]
+
+    def transition(self, request, action):
+        product = self.get_object()
+        if not product.transition(action, request.user):
+            return Response({"detail": _("Product has been changed by another user.")}, status=status.HTTP_409_CONFLICT)
+
+        serializer = self.get_serializer(product)
+        return Response(serializer.data)
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["post"])
+    def claim(self, request, pk=None):
+        """Take free product, responds with 409 when another user has taken it first."""
+        return self.transition(request, "claim")
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["post"])
+    def mark(self, request, pk=None):
+        """Mark product taken by the user, responds with 409 when it is not taken by the user anymore."""
+        return self.transition(request, "mark")
+
+    @extend_schema(request=None)
+    @action(detail=True, methods=["post"])
+    def release(self, request, pk=None):
+        """Give up product taken by the user, responds with 409 when it is not taken by the user anymore."""
+        return self.transition(request, "release")
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+
+from fridger.shopping_lists.managers import COUNT_FIELDS
+from fridger.shopping_lists.models import ShoppingList
+
+
+class Command(BaseCommand):
+    help = "Rebuild stored product counters and archive flag of shopping lists from their products."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report shopping lists whose stored counters differ from their products.",
+        )
+
+    def handle(self, *args, **options):
+        if options["check"]:
+            out_of_sync_filter = Q()
+            for field in COUNT_FIELDS:
+                out_of_sync_filter |= ~Q(**{field: F(f"counted_{field}")})
+            out_of_sync = ShoppingList.objects.with_products_counts().filter(out_of_sync_filter).count()
+            self.stdout.write(f"{out_of_sync} shopping lists have counters out of sync with their products.")
+            return
+
+        with transaction.atomic():
+            updated = ShoppingList.objects.update_counts()
+        self.stdout.write(f"Rebuilt counters of {updated} shopping lists.")
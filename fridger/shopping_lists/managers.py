@@ -1,9 +1,99 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from fridger.utils.enums import ShoppingListProductStatus
+
+# counter of every shopping list product status
+STATUS_COUNT_FIELDS = {
+    ShoppingListProductStatus.FREE: "free_products_count",
+    ShoppingListProductStatus.TAKER: "taken_products_count",
+    ShoppingListProductStatus.TAKER_MARKED: "taken_products_count",
+    ShoppingListProductStatus.BUYER: "bought_products_count",
+}
+COUNT_FIELDS = ("products_count", "free_products_count", "taken_products_count", "bought_products_count")
+
+
+def status_count_deltas(status, sign=1):
+    """Changes of the list counters caused by adding (`sign=1`) or removing (`sign=-1`) product with `status`."""
+    return {"products_count": sign, STATUS_COUNT_FIELDS[status]: sign}
 
 
 class ShoppingListQuerySet(models.QuerySet):
-    def user_shopping_lists(self, user):
-        return self.filter(shopping_list_ownership__user=user)
+    def user_shopping_lists(self, user, with_my_ownership=False):
+        shopping_lists = self.filter(shopping_list_ownership__user=user)
+        if with_my_ownership:
+            # annotations reuse the ownership join filtered to the user above
+            shopping_lists = shopping_lists.annotate(
+                my_ownership_id=F("shopping_list_ownership__id"),
+                my_ownership_permission=F("shopping_list_ownership__permission"),
+            )
+        return shopping_lists
+
+    def add_counts(self, **deltas):
+        """Adjust product counters by `deltas` and derive archive flag from the adjusted counters, in one update."""
+        products_delta = deltas.get("products_count", 0)
+        bought_delta = deltas.get("bought_products_count", 0)
+        return self.update(
+            **{field: F(field) + delta for field, delta in deltas.items()},
+            # expressions read counters from before the update
+            is_archived=Case(
+                When(
+                    products_count__gt=-products_delta,
+                    bought_products_count=F("products_count") + products_delta - bought_delta,
+                    then=Value(True),
+                ),
+                default=Value(False),
+            ),
+            updated_at=timezone.now(),
+        )
+
+    def with_products_counts(self):
+        """Annotate product counters counted from the products, computed with one grouped aggregate."""
+
+        def products_count(*statuses):
+            product_filter = Q(shopping_list_product__status__in=statuses) if statuses else None
+            return Count("shopping_list_product", filter=product_filter)
+
+        return self.annotate(
+            counted_products_count=products_count(),
+            counted_free_products_count=products_count(ShoppingListProductStatus.FREE),
+            counted_taken_products_count=products_count(
+                ShoppingListProductStatus.TAKER, ShoppingListProductStatus.TAKER_MARKED
+            ),
+            counted_bought_products_count=products_count(ShoppingListProductStatus.BUYER),
+        )
+
+    def update_counts(self):
+        """Rebuild product counters and archive flag of the lists from their products."""
+        ShoppingListProduct = apps.get_model("products", "ShoppingListProduct")
+
+        def products_count(*statuses):
+            products = ShoppingListProduct.objects.filter(shopping_list=OuterRef("pk"))
+            if statuses:
+                products = products.filter(status__in=statuses)
+            return Coalesce(
+                Subquery(products.order_by().values("shopping_list").annotate(count=Count("pk")).values("count")),
+                0,
+            )
+
+        self.update(
+            products_count=products_count(),
+            free_products_count=products_count(ShoppingListProductStatus.FREE),
+            taken_products_count=products_count(
+                ShoppingListProductStatus.TAKER, ShoppingListProductStatus.TAKER_MARKED
+            ),
+            bought_products_count=products_count(ShoppingListProductStatus.BUYER),
+        )
+        return self.update(
+            is_archived=Case(
+                When(products_count__gt=0, bought_products_count=F("products_count"), then=Value(True)),
+                default=Value(False),
+            ),
+            updated_at=timezone.now(),
+        )
 
 
 class ShoppingListOwnershipQuerySet(models.QuerySet):
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping_lists', '0010_shoppinglistownership_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shoppinglist',
+            index=models.Index(fields=['created_at', 'id'], name='shopping_list_keyset_idx'),
+        ),
+    ]
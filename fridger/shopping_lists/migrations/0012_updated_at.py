@@ -0,0 +1,23 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shopping_lists', '0011_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='shoppinglistownership',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:55
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# counter: statuses of counted products, all products when empty
+COUNT_STATUSES = {
+    'products_count': [],
+    'free_products_count': ['FREE'],
+    'taken_products_count': ['TAKER', 'TAKER_MARKED'],
+    'bought_products_count': ['BUYER'],
+}
+
+
+def fill_products_counts(apps, schema_editor):
+    ShoppingList = apps.get_model('shopping_lists', 'ShoppingList')
+    ShoppingListProduct = apps.get_model('products', 'ShoppingListProduct')
+
+    def products_count(statuses):
+        products = ShoppingListProduct.objects.filter(shopping_list=OuterRef('pk'))
+        if statuses:
+            products = products.filter(status__in=statuses)
+        return Coalesce(
+            Subquery(products.order_by().values('shopping_list').annotate(count=Count('pk')).values('count')), 0
+        )
+
+    ShoppingList.objects.update(
+        **{field: products_count(statuses) for field, statuses in COUNT_STATUSES.items()}
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0018_sync_indexes'),
+        ('shopping_lists', '0012_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='bought_products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='free_products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='shoppinglist',
+            name='taken_products_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='shoppinglist',
+            name='is_archived',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(fill_products_counts, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,10 @@
 from django.contrib.auth import get_user_model
 from django.db import models
-from django.db.models import Q, signals
+from django.db.models import signals
 from django.dispatch import receiver
 
 from fridger.fridges.models import Fridge
-from fridger.utils.enums import ShoppingListProductStatus, UserPermission
+from fridger.utils.enums import UserPermission
 from fridger.utils.models import BaseModel
 
 from .managers import ShoppingListOwnershipQuerySet, ShoppingListQuerySet
@@ -15,32 +15,22 @@ User = get_user_model()
 class ShoppingList(BaseModel):
     fridge = models.ForeignKey(Fridge, related_name="shopping_list", blank=True, null=True, on_delete=models.SET_NULL)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     name = models.CharField(max_length=60)
-    is_archived = models.BooleanField(default=False)
+    # derived from the counters, all products are bought
+    is_archived = models.BooleanField(default=False, editable=False)
 
-    objects = ShoppingListQuerySet.as_manager()
-
-    @property
-    def free_products_count(self) -> int:
-        return self.shopping_list_product.filter(status=ShoppingListProductStatus.FREE).count()
+    # counters of products by status, adjusted whenever product is added, removed or changes status
+    products_count = models.PositiveIntegerField(default=0, editable=False)
+    free_products_count = models.PositiveIntegerField(default=0, editable=False)
+    taken_products_count = models.PositiveIntegerField(default=0, editable=False)
+    bought_products_count = models.PositiveIntegerField(default=0, editable=False)
 
-    @property
-    def taken_products_count(self) -> int:
-        return self.shopping_list_product.filter(
-            Q(status=ShoppingListProductStatus.TAKER) | Q(status=ShoppingListProductStatus.TAKER_MARKED)
-        ).count()
-
-    @property
-    def bought_products_count(self) -> int:
-        return self.shopping_list_product.filter(status=ShoppingListProductStatus.BUYER).count()
+    objects = ShoppingListQuerySet.as_manager()
 
-    def update_is_archived(self):
-        self.is_archived = (
-            self.shopping_list_product.count() != 0
-            and self.shopping_list_product.exclude(status=ShoppingListProductStatus.BUYER).count() == 0
-        )
-        self.save()
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "id"], name="shopping_list_keyset_idx")]
 
     def __str__(self) -> str:
         return self.name
@@ -52,6 +42,7 @@ class ShoppingListOwnership(BaseModel):
 
     permission = models.CharField(choices=UserPermission.choices, default=UserPermission.READ, max_length=7)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     objects = ShoppingListOwnershipQuerySet.as_manager()
 
@@ -1,17 +1,11 @@
 from rest_framework import permissions
 
-from fridger.utils.enums import UserPermission
-
-from .models import ShoppingListOwnership
+from fridger.utils.ownerships import ADMIN_PERMISSIONS, get_ownerships
 
 
 class IsShoppingListAdminOrCreator(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = obj.shopping_list_ownership.get(user=request.user)
-        except ShoppingListOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR]
+        return get_ownerships(request).shopping_list_permission(obj.id) in ADMIN_PERMISSIONS
 
 
 class IsOwnershipCurrentUser(permissions.BasePermission):
@@ -21,8 +15,4 @@ class IsOwnershipCurrentUser(permissions.BasePermission):
 
 class IsOwnershipAdminOrCreator(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
-        try:
-            ownership = ShoppingListOwnership.objects.get(user=request.user, shopping_list=obj.shopping_list)
-        except ShoppingListOwnership.DoesNotExist:
-            return False
-        return ownership.permission in [UserPermission.ADMIN, UserPermission.CREATOR]
+        return get_ownerships(request).shopping_list_permission(obj.shopping_list_id) in ADMIN_PERMISSIONS
@@ -1,12 +1,15 @@
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Q
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import exceptions, serializers
 
 from fridger.fridges.serializers import BasicFridgeSerializer
+from fridger.products.managers import quantity_deltas
 from fridger.products.models import (
     FridgeProduct,
     FridgeProductHistory,
@@ -17,7 +20,12 @@ from fridger.products.serializers import (
     UpdatePriceShoppingListProductSerializer,
 )
 from fridger.users.serializers import BasicUserSerializer
-from fridger.utils.enums import ShoppingListProductStatus, UserPermission
+from fridger.utils.enums import (
+    FridgeProductStatus,
+    ShoppingListProductStatus,
+    UserPermission,
+)
+from fridger.utils.ownerships import WRITE_PERMISSIONS, get_ownerships
 
 from .models import ShoppingList, ShoppingListOwnership
 
@@ -58,7 +66,10 @@ class CreateShoppingListSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context.get("request").user
         shopping_list = ShoppingList.objects.create(**validated_data)
-        ShoppingListOwnership.objects.create(user=user, shopping_list=shopping_list, permission=UserPermission.CREATOR)
+        ownership = ShoppingListOwnership.objects.create(
+            user=user, shopping_list=shopping_list, permission=UserPermission.CREATOR
+        )
+        get_ownerships(self.context.get("request")).add("shopping_list", ownership)
         return shopping_list
 
 
@@ -81,8 +92,10 @@ class ListShoppingListSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(CurrentUserShoppingListOwnershipSerializer)
     def get_my_ownership(self, obj):
-        user = self.context["request"].user
-        ownership = obj.shopping_list_ownership.get(user=user)
+        if hasattr(obj, "my_ownership_id"):
+            ownership = ShoppingListOwnership(id=obj.my_ownership_id, permission=obj.my_ownership_permission)
+        else:
+            ownership = get_ownerships(self.context["request"]).shopping_list_ownership(obj.id)
         return CurrentUserShoppingListOwnershipSerializer(ownership).data
 
 
@@ -106,8 +119,10 @@ class DetailShoppingListSerializer(serializers.ModelSerializer):
 
     @extend_schema_field(CurrentUserShoppingListOwnershipSerializer)
     def get_my_ownership(self, obj):
-        user = self.context["request"].user
-        ownership = obj.shopping_list_ownership.get(user=user)
+        if hasattr(obj, "my_ownership_id"):
+            ownership = ShoppingListOwnership(id=obj.my_ownership_id, permission=obj.my_ownership_permission)
+        else:
+            ownership = get_ownerships(self.context["request"]).shopping_list_ownership(obj.id)
         return CurrentUserShoppingListOwnershipSerializer(ownership).data
 
 
@@ -147,14 +162,12 @@ class CreateShoppingListOwnershipSerializer(serializers.ModelSerializer):
         )
 
     def validate(self, attrs):
-        request_user = self.context.get("request").user
         shopping_list = attrs.get("shopping_list")
-        try:
-            ownership = request_user.shopping_list_ownership.get(shopping_list=shopping_list)
-        except ShoppingListOwnership.DoesNotExist:
+        permission = get_ownerships(self.context.get("request")).shopping_list_permission(shopping_list.id)
+        if permission is None:
             raise exceptions.PermissionDenied(_("User does not belong to this shopping list."))
 
-        if ownership.permission not in [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]:
+        if permission not in WRITE_PERMISSIONS:
             raise exceptions.PermissionDenied(_("User does not have permission to add friend to this shopping list."))
 
         return attrs
@@ -179,27 +192,42 @@ class BuyListOfProductsSerializer(serializers.ModelSerializer):
     def update(self, instance, validated_data):
         user = self.context["request"].user
         validated_products = validated_data.pop("shopping_list_product", [])
-        validated_products_ids = [validated_product["id"] for validated_product in validated_products]
+        prices = {validated_product["id"]: validated_product["price"] for validated_product in validated_products}
+        bought_at = timezone.now()
         modified_products = []
-        for product in instance.shopping_list_product.filter(id__in=validated_products_ids):
-            product.taken_by = user
-            product.price = next(item["price"] for item in validated_products if item["id"] == product.id)
-            product.status = ShoppingListProductStatus.BUYER
-            modified_products.append(product)
-
-            if instance.fridge:
-                fridge_product = FridgeProduct.objects.create(
-                    fridge=instance.fridge,
-                    name=product.name,
-                    quantity_type=product.quantity_type,
-                )
-                FridgeProductHistory.objects.create(
-                    product=fridge_product,
-                    created_by=user,
-                    quantity=product.quantity,
-                )
-        ShoppingListProduct.objects.bulk_update(modified_products, ["taken_by", "price", "status"])
-        instance.update_is_archived()
+        fridge_products = []
+        fridge_products_history = []
+        with transaction.atomic():
+            for product in instance.shopping_list_product.filter(id__in=prices.keys()):
+                product.taken_by = user
+                product.price = prices[product.id]
+                product.status = ShoppingListProductStatus.BUYER
+                # bulk_update does not refresh auto_now fields
+                product.updated_at = bought_at
+                modified_products.append(product)
+
+                if instance.fridge:
+                    fridge_product = FridgeProduct(
+                        fridge=instance.fridge,
+                        name=product.name,
+                        quantity_type=product.quantity_type,
+                        is_available=product.quantity > 0,
+                        **quantity_deltas(FridgeProductStatus.UNUSED, product.quantity),
+                    )
+                    fridge_products.append(fridge_product)
+                    fridge_product_history = FridgeProductHistory(
+                        product=fridge_product,
+                        created_by=user,
+                        status=FridgeProductStatus.UNUSED,
+                        quantity=product.quantity,
+                    )
+                    fridge_product_history.set_base_quantity()
+                    fridge_products_history.append(fridge_product_history)
+            FridgeProduct.objects.bulk_create(fridge_products)
+            FridgeProductHistory.objects.bulk_create(fridge_products_history)
+            ShoppingListProduct.objects.bulk_update(modified_products, ["taken_by", "price", "status", "updated_at"])
+            ShoppingListProduct.update_daily_statistics(modified_products)
+            ShoppingListProduct.update_shopping_lists_counts(modified_products)
 
         return instance
 
@@ -226,7 +254,7 @@ class ReadOnlyYourProductsSerializer(serializers.ModelSerializer):
 
 
 class ShoppingListSummaryUsers(serializers.ModelSerializer):
-    products = serializers.SerializerMethodField()
+    products = BasicListShoppingListProductSerializer(source="summary_products", many=True, read_only=True)
     total_price = serializers.SerializerMethodField()
 
     class Meta:
@@ -240,21 +268,8 @@ class ShoppingListSummaryUsers(serializers.ModelSerializer):
         )
         read_only_fields = fields
 
-    @extend_schema_field(BasicListShoppingListProductSerializer(many=True))
-    def get_products(self, obj):
-        shopping_list = self.context["shopping_list"]
-        products = (
-            obj.shopping_list_product.filter(shopping_list=shopping_list)
-            .exclude(status=ShoppingListProductStatus.FREE)
-            .order_by("-created_at")
-        )
-
-        return BasicListShoppingListProductSerializer(products, many=True).data
-
     def get_total_price(self, obj) -> Decimal:
-        shopping_list = self.context["shopping_list"]
-        products = obj.shopping_list_product.filter(shopping_list=shopping_list, status=ShoppingListProductStatus.BUYER)
-        return sum([product.price for product in products if product.price])
+        return obj.summary_total_price
 
 
 class ReadOnlySummaryProducts(serializers.ModelSerializer):
@@ -270,5 +285,21 @@ class ReadOnlySummaryProducts(serializers.ModelSerializer):
 
     @extend_schema_field(ShoppingListSummaryUsers(many=True))
     def get_users(self, obj):
-        users = User.objects.filter(id__in=obj.shopping_list_product.values_list("taken_by", flat=True))
-        return ShoppingListSummaryUsers(users, many=True, context={"shopping_list": obj}).data
+        products = (
+            obj.shopping_list_product.exclude(status=ShoppingListProductStatus.FREE)
+            .filter(taken_by__isnull=False)
+            .select_related("taken_by")
+            .order_by("-created_at")
+        )
+        users = {}
+        for product in products:
+            if product.taken_by_id not in users:
+                user = product.taken_by
+                user.summary_products = []
+                user.summary_total_price = 0
+                users[product.taken_by_id] = user
+            user = users[product.taken_by_id]
+            user.summary_products.append(product)
+            if product.status == ShoppingListProductStatus.BUYER and product.price:
+                user.summary_total_price += product.price
+        return ShoppingListSummaryUsers(users.values(), many=True).data
@@ -1,10 +1,20 @@
+from decimal import Decimal
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from model_bakery import baker
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
-from fridger.products.models import FridgeProduct, ShoppingListProduct
-from fridger.shopping_lists.models import ShoppingListOwnership
+from fridger.products.models import (
+    FridgeProduct,
+    FridgeProductHistory,
+    ShoppingListProduct,
+)
+from fridger.shopping_lists.models import ShoppingList, ShoppingListOwnership
 from fridger.utils.enums import ShoppingListProductStatus, UserPermission
 
 
@@ -50,6 +60,58 @@ class TestShoppingListsViews:
         assert shopping_list_ownership_db == shopping_list_ownership
         assert ShoppingListOwnership.objects.count() == 1
 
+    def test_list_shopping_lists_counts(self, django_assert_num_queries):
+        client = APIClient()
+        client.force_authenticate(self.test_user)
+        ownerships = baker.make(
+            "shopping_lists.ShoppingListOwnership",
+            user=self.test_user,
+            permission=UserPermission.WRITE,
+            _quantity=4,
+        )
+        for ownership in ownerships:
+            baker.make("shopping_lists.ShoppingListOwnership", shopping_list=ownership.shopping_list)
+            for status, quantity in [
+                (ShoppingListProductStatus.FREE, 3),
+                (ShoppingListProductStatus.TAKER, 1),
+                (ShoppingListProductStatus.TAKER_MARKED, 1),
+                (ShoppingListProductStatus.BUYER, 2),
+            ]:
+                baker.make(
+                    "products.ShoppingListProduct",
+                    shopping_list=ownership.shopping_list,
+                    status=status,
+                    _quantity=quantity,
+                )
+
+        with django_assert_num_queries(1):
+            response = client.get(self.url)
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert len(json_response) == 4
+        assert all(item["free_products_count"] == 3 for item in json_response)
+        assert all(item["taken_products_count"] == 2 for item in json_response)
+        assert all(item["bought_products_count"] == 2 for item in json_response)
+        assert {item["my_ownership"]["id"] for item in json_response} == {str(item.id) for item in ownerships}
+        assert all(item["my_ownership"]["permission"] == UserPermission.WRITE for item in json_response)
+
+    def test_all_products_page_loads_only_the_page(self):
+        client = APIClient()
+        client.force_authenticate(self.test_user)
+        shopping_list = baker.make("shopping_lists.ShoppingList")
+        baker.make("shopping_lists.ShoppingListOwnership", shopping_list=shopping_list, user=self.test_user)
+        baker.make("products.ShoppingListProduct", shopping_list=shopping_list, taken_by=self.test_user, _quantity=5)
+        url = reverse("shopping-list-all-products", args=[shopping_list.id])
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, {"page_size": 2})
+
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == 2
+        assert len(context.captured_queries) == 2
+        assert "LIMIT 3" in context.captured_queries[-1]["sql"]
+
     def test_list_fridge_ownerships(self):
         client = APIClient()
         client.force_authenticate(self.test_user)
@@ -176,3 +238,123 @@ class TestBuyingProducts:
 
         assert response.status_code == 200
         assert FridgeProduct.objects.count() == 5
+
+    def test_buy_products_runs_constant_number_of_queries(self, django_assert_max_num_queries):
+        fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.ADMIN).fridge
+        shopping_list = baker.make(
+            "shopping_lists.ShoppingListOwnership",
+            user=self.user,
+            permission=UserPermission.ADMIN,
+            shopping_list__fridge=fridge,
+        ).shopping_list
+        products = baker.make(
+            "products.ShoppingListProduct",
+            status=ShoppingListProductStatus.TAKER,
+            taken_by=self.user,
+            shopping_list=shopping_list,
+            quantity=Decimal(3),
+            price=None,
+            _quantity=20,
+        )
+
+        data = {"products": [{"id": str(product.id), "price": "2.00"} for product in products]}
+        with django_assert_max_num_queries(16):
+            response = self.client.post(self._get_detail_url(shopping_list.id), data=data, format="json")
+        shopping_list.refresh_from_db()
+
+        assert response.status_code == 200
+        assert shopping_list.is_archived
+        assert FridgeProductHistory.objects.filter(created_by=self.user).count() == 20
+        assert FridgeProduct.objects.filter(is_available=True, quantity_base=3, quantity_left=3).count() == 20
+
+
+@pytest.mark.django_db
+class TestShoppingListSummary:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.shopping_list = baker.make("shopping_lists.ShoppingListOwnership", user=self.user).shopping_list
+
+    def test_summary_groups_products_by_user(self, django_assert_num_queries):
+        users = baker.make("users.User", _quantity=3)
+        for user in users:
+            baker.make(
+                "products.ShoppingListProduct",
+                shopping_list=self.shopping_list,
+                taken_by=user,
+                status=ShoppingListProductStatus.BUYER,
+                price=Decimal("2.50"),
+                _quantity=2,
+            )
+            baker.make(
+                "products.ShoppingListProduct",
+                shopping_list=self.shopping_list,
+                taken_by=user,
+                status=ShoppingListProductStatus.TAKER,
+                price=Decimal("100.00"),
+            )
+        baker.make(
+            "products.ShoppingListProduct", shopping_list=self.shopping_list, status=ShoppingListProductStatus.FREE
+        )
+
+        with django_assert_num_queries(2):
+            response = self.client.get(reverse("shopping-list-summary", args=[self.shopping_list.id]))
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert {item["id"] for item in json_response["users"]} == {str(user.id) for user in users}
+        assert all(len(item["products"]) == 3 for item in json_response["users"])
+        assert all(item["total_price"] == 5 for item in json_response["users"])
+
+
+@pytest.mark.django_db
+class TestShoppingListCounters:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.shopping_list = baker.make("shopping_lists.ShoppingList")
+        self.products = baker.make("products.ShoppingListProduct", shopping_list=self.shopping_list, _quantity=3)
+
+    def _counts(self):
+        self.shopping_list.refresh_from_db()
+        return (
+            self.shopping_list.products_count,
+            self.shopping_list.free_products_count,
+            self.shopping_list.taken_products_count,
+            self.shopping_list.bought_products_count,
+        )
+
+    def test_counters_follow_product_changes(self):
+        self.products[0].status = ShoppingListProductStatus.TAKER
+        self.products[0].save()
+        self.products[1].status = ShoppingListProductStatus.BUYER
+        self.products[1].save()
+        self.products[2].delete()
+
+        assert self._counts() == (2, 0, 1, 1)
+        assert not self.shopping_list.is_archived
+
+    def test_shopping_list_is_archived_when_all_products_are_bought(self):
+        for product in self.products:
+            product.status = ShoppingListProductStatus.BUYER
+            product.save()
+
+        assert self._counts() == (3, 0, 0, 3)
+        assert self.shopping_list.is_archived
+
+        baker.make("products.ShoppingListProduct", shopping_list=self.shopping_list)
+
+        assert self._counts() == (4, 1, 0, 3)
+        assert not self.shopping_list.is_archived
+
+    def test_rebuild_shopping_lists_counts(self):
+        ShoppingList.objects.update(products_count=0, free_products_count=0, is_archived=True)
+        out = StringIO()
+
+        call_command("rebuild_shopping_lists_counts", "--check", stdout=out)
+        call_command("rebuild_shopping_lists_counts", stdout=StringIO())
+
+        assert out.getvalue().startswith("1 shopping lists")
+        assert self._counts() == (3, 3, 0, 0)
+        assert not self.shopping_list.is_archived
@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 
 from fridger.products.serializers import ListShoppingListProductSerializer
+from fridger.utils.pagination import KeysetPagination
 
 from .models import ShoppingList, ShoppingListOwnership
 from .permissions import (
@@ -29,17 +30,15 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
 
     queryset = ShoppingList.objects.none()
     serializer_class = DetailShoppingListSerializer
+    pagination_class = KeysetPagination
     filterset_fields = ["is_archived"]
 
     def get_queryset(self):
         user = self.request.user
-        if self.action == "all_products":
-            return (
-                ShoppingList.objects.user_shopping_lists(user)
-                .prefetch_related("shopping_list_product__taken_by")
-                .order_by("-created_at")
-            )
-        return ShoppingList.objects.user_shopping_lists(user).order_by("-created_at")
+        with_my_ownership = self.action in ["list", "retrieve"]
+        return ShoppingList.objects.user_shopping_lists(user, with_my_ownership=with_my_ownership).order_by(
+            "-created_at"
+        )
 
     def get_serializer_class(self):
         if self.action == "retrieve":
@@ -88,8 +87,12 @@ class ShoppingListViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["get"], url_path="all-products")
     def all_products(self, request, pk=None):
         shopping_list = self.get_object()
-        products = shopping_list.shopping_list_product.order_by("-created_at")
+        products = shopping_list.shopping_list_product.select_related("taken_by").order_by("-created_at")
 
+        page = self.paginate_queryset(products)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
         serializer = self.get_serializer(products, many=True)
         return Response(serializer.data)
 
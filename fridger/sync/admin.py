@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+from .models import IdempotencyKey, Tombstone
+
+# Register your models here.
+admin.site.register(Tombstone)
+admin.site.register(IdempotencyKey)
@@ -0,0 +1,66 @@
+from django.db.models import Q
+
+from fridger.fridges.models import FridgeOwnership
+from fridger.products.models import (
+    FridgeProduct,
+    FridgeProductHistory,
+    ShoppingListProduct,
+)
+from fridger.shopping_lists.models import ShoppingList, ShoppingListOwnership
+from fridger.sync.models import Tombstone
+
+
+def _changed(field, scope_field, scope, new_scope, since):
+    """Rows of the scope changed since `since`, and all rows of the new part of the scope."""
+    if since is None:
+        return Q(**{f"{scope_field}__in": scope})
+    return Q(**{f"{scope_field}__in": scope, f"{field}__gte": since}) | Q(**{f"{scope_field}__in": new_scope})
+
+
+def collect_changes(user, since=None):
+    """
+    Rows of the user's fridges and shopping lists changed since `since`, with tombstones of deleted rows.
+
+    Fridges and shopping lists shared with the user since then are sent whole, everything is sent when `since` is
+    `None`. Every kind of rows is read with one query using its sync index, so the cost follows the number of changes.
+    """
+    fridge_ownerships = list(FridgeOwnership.objects.filter(user=user))
+    shopping_list_ownerships = list(ShoppingListOwnership.objects.filter(user=user))
+    fridges = [ownership.fridge_id for ownership in fridge_ownerships]
+    shopping_lists = [ownership.shopping_list_id for ownership in shopping_list_ownerships]
+    if since is not None:
+        fridge_ownerships = [ownership for ownership in fridge_ownerships if ownership.updated_at >= since]
+        shopping_list_ownerships = [
+            ownership for ownership in shopping_list_ownerships if ownership.updated_at >= since
+        ]
+    new_fridges = [
+        ownership.fridge_id for ownership in fridge_ownerships if since is None or ownership.created_at >= since
+    ]
+    new_shopping_lists = [
+        ownership.shopping_list_id
+        for ownership in shopping_list_ownerships
+        if since is None or ownership.created_at >= since
+    ]
+
+    if since is None:
+        history = Q(product__fridge__in=fridges)
+        deleted = Tombstone.objects.none()
+    else:
+        # adding history updates product quantities, so new history belongs to changed products
+        changed_products = FridgeProduct.objects.filter(fridge__in=fridges, updated_at__gte=since)
+        history = Q(product__in=changed_products, created_at__gte=since) | Q(product__fridge__in=new_fridges)
+        deleted = Tombstone.objects.user_tombstones(user, fridges, shopping_lists).filter(deleted_at__gte=since)
+
+    return {
+        "fridge_ownerships": fridge_ownerships,
+        "shopping_list_ownerships": shopping_list_ownerships,
+        "fridge_products": FridgeProduct.objects.filter(_changed("updated_at", "fridge", fridges, new_fridges, since)),
+        "fridge_product_history": FridgeProductHistory.objects.filter(history),
+        "shopping_lists": ShoppingList.objects.filter(
+            _changed("updated_at", "id", shopping_lists, new_shopping_lists, since)
+        ),
+        "shopping_list_products": ShoppingListProduct.objects.filter(
+            _changed("updated_at", "shopping_list", shopping_lists, new_shopping_lists, since)
+        ),
+        "deleted": deleted,
+    }
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from fridger.sync.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete idempotency keys of uploaded mutations older than their retention period."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.expired().delete()
+        self.stdout.write(f"Deleted {deleted} idempotency keys.")
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from fridger.sync.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Delete tombstones older than the sync retention period, clients syncing later get whole data."
+
+    def handle(self, *args, **options):
+        deleted, _ = Tombstone.objects.expired().delete()
+        self.stdout.write(f"Deleted {deleted} tombstones.")
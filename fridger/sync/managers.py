@@ -0,0 +1,29 @@
+import datetime
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class TombstoneQuerySet(models.QuerySet):
+    def user_tombstones(self, user, fridges, shopping_lists):
+        """Deleted rows of the fridges and shopping lists, and ownerships the user has lost."""
+        return self.filter(
+            Q(user_id=user.id)
+            | Q(user_id=None, fridge_id__in=fridges)
+            | Q(user_id=None, shopping_list_id__in=shopping_lists)
+        )
+
+    def expired(self, now=None):
+        now = now or timezone.now()
+        return self.filter(deleted_at__lt=now - datetime.timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS))
+
+
+class IdempotencyKeyQuerySet(models.QuerySet):
+    def user_keys(self, user, keys):
+        return {idempotency_key.key: idempotency_key for idempotency_key in self.filter(user=user, key__in=keys)}
+
+    def expired(self, now=None):
+        now = now or timezone.now()
+        return self.filter(created_at__lt=now - datetime.timedelta(days=settings.SYNC_IDEMPOTENCY_KEY_RETENTION_DAYS))
@@ -0,0 +1,46 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('model', models.CharField(choices=[('FRIDGE_PRODUCT', 'Fridge product'), ('FRIDGE_PRODUCT_HISTORY', 'Fridge product history'), ('SHOPPING_LIST', 'Shopping list'), ('SHOPPING_LIST_PRODUCT', 'Shopping list product'), ('FRIDGE_OWNERSHIP', 'Fridge ownership'), ('SHOPPING_LIST_OWNERSHIP', 'Shopping list ownership')], max_length=23)),
+                ('object_id', models.UUIDField()),
+                ('fridge_id', models.UUIDField(blank=True, null=True)),
+                ('shopping_list_id', models.UUIDField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tombstone', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['fridge_id', 'deleted_at'], name='tombstone_fridge_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['shopping_list_id', 'deleted_at'], name='tombstone_shopping_list_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user', 'deleted_at'], name='tombstone_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.7 on 2026-10-18 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sync', '0002_idempotencykey'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='tombstone',
+            name='tombstone_user_idx',
+        ),
+        migrations.RemoveField(
+            model_name='tombstone',
+            name='user',
+        ),
+        migrations.AddField(
+            model_name='tombstone',
+            name='user_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['user_id', 'deleted_at'], name='tombstone_user_idx'),
+        ),
+    ]
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import signals
+from django.dispatch import receiver
+
+from fridger.fridges.models import FridgeOwnership
+from fridger.products.models import FridgeProduct, ShoppingListProduct
+from fridger.shopping_lists.models import ShoppingList, ShoppingListOwnership
+from fridger.sync.managers import IdempotencyKeyQuerySet, TombstoneQuerySet
+from fridger.utils.enums import SyncModel
+from fridger.utils.models import BaseModel
+
+User = get_user_model()
+
+
+class Tombstone(BaseModel):
+    """Deleted row which offline clients have to remove from their copy, pruned after the retention period."""
+
+    model = models.CharField(choices=SyncModel.choices, max_length=23)
+    object_id = models.UUIDField()
+    # plain ids, the fridge, shopping list or user is often deleted together with the row
+    fridge_id = models.UUIDField(blank=True, null=True)
+    shopping_list_id = models.UUIDField(blank=True, null=True)
+    # set only for ownerships, the user who lost access to the fridge or shopping list
+    user_id = models.UUIDField(blank=True, null=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    objects = TombstoneQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["fridge_id", "deleted_at"], name="tombstone_fridge_idx"),
+            models.Index(fields=["shopping_list_id", "deleted_at"], name="tombstone_shopping_list_idx"),
+            models.Index(fields=["user_id", "deleted_at"], name="tombstone_user_idx"),
+            models.Index(fields=["deleted_at"], name="tombstone_deleted_at_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.model} {self.object_id}"
+
+
+class IdempotencyKey(BaseModel):
+    """Result of a successful batched mutation, replayed when the client sends an operation with the same key."""
+
+    user = models.ForeignKey(User, related_name="idempotency_key", on_delete=models.CASCADE, db_index=False)
+    key = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField()
+    response = models.JSONField(encoder=DjangoJSONEncoder, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = IdempotencyKeyQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="unique_user_idempotency_key"),
+        ]
+        indexes = [
+            models.Index(fields=["created_at"], name="idempotency_key_created_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return self.key
+
+
+@receiver(signals.post_delete, sender=FridgeProduct)
+def fridge_product_post_delete_signal(sender, instance, **kwargs):
+    Tombstone.objects.create(model=SyncModel.FRIDGE_PRODUCT, object_id=instance.id, fridge_id=instance.fridge_id)
+
+
+@receiver(signals.post_delete, sender=ShoppingList)
+def shopping_list_post_delete_signal(sender, instance, **kwargs):
+    Tombstone.objects.create(model=SyncModel.SHOPPING_LIST, object_id=instance.id, shopping_list_id=instance.id)
+
+
+@receiver(signals.post_delete, sender=ShoppingListProduct)
+def shopping_list_product_post_delete_signal(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model=SyncModel.SHOPPING_LIST_PRODUCT, object_id=instance.id, shopping_list_id=instance.shopping_list_id
+    )
+
+
+@receiver(signals.post_delete, sender=FridgeOwnership)
+def fridge_ownership_post_delete_signal(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model=SyncModel.FRIDGE_OWNERSHIP, object_id=instance.id, fridge_id=instance.fridge_id, user_id=instance.user_id
+    )
+
+
+@receiver(signals.post_delete, sender=ShoppingListOwnership)
+def shopping_list_ownership_post_delete_signal(sender, instance, **kwargs):
+    Tombstone.objects.create(
+        model=SyncModel.SHOPPING_LIST_OWNERSHIP,
+        object_id=instance.id,
+        shopping_list_id=instance.shopping_list_id,
+        user_id=instance.user_id,
+    )
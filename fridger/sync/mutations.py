@@ -0,0 +1,121 @@
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError, transaction
+from django.http import Http404
+from django.utils.translation import gettext as _
+from rest_framework import exceptions, status
+
+from fridger.products.views import (
+    FridgeProductHistoryViewSet,
+    FridgeProductViewSet,
+    ShoppingListProductViewSet,
+)
+from fridger.sync.models import IdempotencyKey
+
+MUTATION_VIEWSETS = {
+    "fridge_product": FridgeProductViewSet,
+    "fridge_product_history": FridgeProductHistoryViewSet,
+    "shopping_list_product": ShoppingListProductViewSet,
+}
+MUTATION_ACTIONS = {
+    "create": "post",
+    "partial_update": "patch",
+    "destroy": "delete",
+}
+
+
+class KeyAlreadyUsed(Exception):
+    """Operation with the same key was committed by a concurrent request."""
+
+
+def _error(exc):
+    """Status code and data of the error, like DRF exception handler without marking the transaction for rollback."""
+    if isinstance(exc, Http404):
+        exc = exceptions.NotFound()
+    elif isinstance(exc, PermissionDenied):
+        exc = exceptions.PermissionDenied()
+    if not isinstance(exc, exceptions.APIException):
+        raise exc
+    if isinstance(exc.detail, (list, dict)):
+        return exc.status_code, exc.detail
+    return exc.status_code, {"detail": exc.detail}
+
+
+def _perform(request, operation, data):
+    """Run the action of the resource viewset with its serializer, permissions and hooks."""
+    action = operation["action"]
+    kwargs = {"pk": operation["id"]} if "id" in operation else {}
+    view = MUTATION_VIEWSETS[operation["resource"]](
+        request=request, args=(), kwargs=kwargs, action=action, format_kwarg=None
+    )
+    view.check_permissions(request)
+    if action == "create":
+        serializer = view.get_serializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        view.perform_create(serializer)
+        return status.HTTP_201_CREATED, serializer.data
+
+    instance = view.get_object()
+    if action == "partial_update":
+        serializer = view.get_serializer(instance, data=data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        view.perform_update(serializer)
+        return status.HTTP_200_OK, serializer.data
+    view.perform_destroy(instance)
+    return status.HTTP_204_NO_CONTENT, None
+
+
+def _resolve_refs(operation, results):
+    """Data of the operation with fields referencing earlier operations set to ids of their created rows."""
+    data = dict(operation["data"])
+    for field, key in operation["refs"].items():
+        result = results.get(key)
+        if result is None or result["status"] != status.HTTP_201_CREATED:
+            raise exceptions.ValidationError({"refs": {field: _("Referenced operation did not create a row.")}})
+        data[field] = result["data"]["id"]
+    return data
+
+
+def _result(key, status_code, data, replayed=False):
+    return {"key": key, "status": status_code, "data": data, "replayed": replayed}
+
+
+def _run(request, operation, results):
+    key = operation["key"]
+    try:
+        with transaction.atomic():
+            status_code, data = _perform(request, operation, _resolve_refs(operation, results))
+            try:
+                with transaction.atomic():
+                    IdempotencyKey.objects.create(user=request.user, key=key, status_code=status_code, response=data)
+            except IntegrityError:
+                raise KeyAlreadyUsed()
+    except KeyAlreadyUsed:
+        raise
+    except Exception as exc:
+        status_code, data = _error(exc)
+    return _result(key, status_code, data)
+
+
+def run_mutations(request, operations):
+    """
+    Run operations in order in one transaction, each in its own savepoint so a failed one does not undo the others.
+
+    Successful results are stored under operation keys, operations with known keys return the stored result instead
+    of running again.
+    """
+    user = request.user
+    stored_keys = IdempotencyKey.objects.user_keys(user, [operation["key"] for operation in operations])
+    results = {}
+    with transaction.atomic():
+        for operation in operations:
+            key = operation["key"]
+            if key not in stored_keys:
+                try:
+                    results[key] = _run(request, operation, results)
+                    continue
+                except KeyAlreadyUsed:
+                    # the concurrent request has committed, its result is visible now
+                    stored_keys[key] = IdempotencyKey.objects.get(user=user, key=key)
+            idempotency_key = stored_keys[key]
+            results[key] = _result(key, idempotency_key.status_code, idempotency_key.response, replayed=True)
+    return list(results.values())
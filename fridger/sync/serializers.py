@@ -0,0 +1,158 @@
+from django.utils.translation import gettext as _
+from rest_framework import serializers
+
+from fridger.fridges.models import FridgeOwnership
+from fridger.products.models import (
+    FridgeProduct,
+    FridgeProductHistory,
+    ShoppingListProduct,
+)
+from fridger.shopping_lists.models import ShoppingList, ShoppingListOwnership
+
+from .models import Tombstone
+from .mutations import MUTATION_ACTIONS, MUTATION_VIEWSETS
+
+
+class ChangesQuerySerializer(serializers.Serializer):
+    since = serializers.DateTimeField(required=False, help_text="Cursor returned by the previous sync.")
+
+
+class SyncFridgeOwnershipSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FridgeOwnership
+        fields = ("id", "fridge", "permission", "updated_at")
+        read_only_fields = fields
+
+
+class SyncShoppingListOwnershipSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShoppingListOwnership
+        fields = ("id", "shopping_list", "permission", "updated_at")
+        read_only_fields = fields
+
+
+class SyncFridgeProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FridgeProduct
+        fields = (
+            "id",
+            "fridge",
+            "name",
+            "producer_name",
+            "barcode",
+            "image",
+            "expiration_date",
+            "quantity_type",
+            "is_available",
+            "quantity_base",
+            "quantity_used",
+            "quantity_wasted",
+            "quantity_left",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
+class SyncFridgeProductHistorySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = FridgeProductHistory
+        fields = ("id", "product", "created_by", "status", "quantity", "created_at")
+        read_only_fields = fields
+
+
+class SyncShoppingListSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShoppingList
+        fields = ("id", "fridge", "name", "is_archived", "created_at", "updated_at")
+        read_only_fields = fields
+
+
+class SyncShoppingListProductSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShoppingListProduct
+        fields = (
+            "id",
+            "shopping_list",
+            "taken_by",
+            "name",
+            "note",
+            "status",
+            "price",
+            "quantity_type",
+            "quantity",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+
+class TombstoneSerializer(serializers.ModelSerializer):
+    id = serializers.UUIDField(source="object_id", read_only=True)
+
+    class Meta:
+        model = Tombstone
+        fields = ("model", "id", "fridge_id", "shopping_list_id", "deleted_at")
+        read_only_fields = fields
+
+
+class ChangesSerializer(serializers.Serializer):
+    cursor = serializers.CharField(read_only=True, help_text="Pass as `since` to the next sync.")
+    reset = serializers.BooleanField(read_only=True, help_text="Whole data is sent, local copy should be replaced.")
+    fridge_ownerships = SyncFridgeOwnershipSerializer(many=True, read_only=True)
+    shopping_list_ownerships = SyncShoppingListOwnershipSerializer(many=True, read_only=True)
+    fridge_products = SyncFridgeProductSerializer(many=True, read_only=True)
+    fridge_product_history = SyncFridgeProductHistorySerializer(many=True, read_only=True)
+    shopping_lists = SyncShoppingListSerializer(many=True, read_only=True)
+    shopping_list_products = SyncShoppingListProductSerializer(many=True, read_only=True)
+    deleted = TombstoneSerializer(many=True, read_only=True)
+
+
+class MutationSerializer(serializers.Serializer):
+    key = serializers.CharField(max_length=64, help_text="Client key, operation sent again with it is not repeated.")
+    resource = serializers.ChoiceField(choices=list(MUTATION_VIEWSETS))
+    action = serializers.ChoiceField(choices=list(MUTATION_ACTIONS))
+    id = serializers.UUIDField(required=False, help_text="Row to update or delete.")
+    data = serializers.DictField(required=False, default=dict)
+    refs = serializers.DictField(
+        child=serializers.CharField(),
+        required=False,
+        default=dict,
+        help_text="Fields of data set to id of the row created by the earlier operation with given key.",
+    )
+
+    def validate(self, attrs):
+        viewset = MUTATION_VIEWSETS[attrs["resource"]]
+        if MUTATION_ACTIONS[attrs["action"]] not in viewset.http_method_names:
+            raise serializers.ValidationError({"action": _("Action is not allowed for this resource.")})
+        if attrs["action"] != "create" and "id" not in attrs:
+            raise serializers.ValidationError({"id": _("This field is required.")})
+        return attrs
+
+
+class MutationsSerializer(serializers.Serializer):
+    max_operations = 100
+
+    operations = MutationSerializer(many=True)
+
+    def validate_operations(self, operations):
+        if len(operations) > self.max_operations:
+            raise serializers.ValidationError(
+                _("Batch should not contain more than %(max_operations)s operations.")
+                % {"max_operations": self.max_operations}
+            )
+        keys = [operation["key"] for operation in operations]
+        if len(set(keys)) != len(keys):
+            raise serializers.ValidationError(_("Operation keys should be unique."))
+        return operations
+
+
+class MutationResultSerializer(serializers.Serializer):
+    key = serializers.CharField(read_only=True)
+    status = serializers.IntegerField(read_only=True, help_text="HTTP status of the operation.")
+    data = serializers.JSONField(read_only=True, help_text="Response of the operation or its errors.")
+    replayed = serializers.BooleanField(read_only=True, help_text="Stored result of the earlier upload.")
+
+
+class MutationResultsSerializer(serializers.Serializer):
+    results = MutationResultSerializer(many=True, read_only=True)
@@ -0,0 +1,227 @@
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+from model_bakery import baker
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from fridger.products.models import FridgeProduct, FridgeProductHistory
+from fridger.sync.models import IdempotencyKey, Tombstone
+from fridger.utils.enums import (
+    FridgeProductStatus,
+    QuantityType,
+    ShoppingListProductStatus,
+    SyncModel,
+    UserPermission,
+)
+
+
+@pytest.mark.django_db
+class TestChangesViews:
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        settings.SYNC_CURSOR_OVERLAP = 0
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("changes")
+        self.fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.CREATOR).fridge
+        self.shopping_list = baker.make(
+            "shopping_lists.ShoppingListOwnership", user=self.user, permission=UserPermission.CREATOR
+        ).shopping_list
+        self.products = baker.make("products.FridgeProduct", fridge=self.fridge, _quantity=3)
+        self.shopping_list_products = baker.make(
+            "products.ShoppingListProduct", shopping_list=self.shopping_list, _quantity=2
+        )
+        # rows of other users are never sent
+        baker.make("products.FridgeProduct")
+        baker.make("products.ShoppingListProduct")
+
+    def _ids(self, rows):
+        return {row["id"] for row in rows}
+
+    def test_changes_without_cursor_sends_everything(self):
+        response = self.client.get(self.url)
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert json_response["reset"] is True
+        assert self._ids(json_response["fridge_products"]) == {str(product.id) for product in self.products}
+        assert self._ids(json_response["shopping_lists"]) == {str(self.shopping_list.id)}
+        assert self._ids(json_response["shopping_list_products"]) == {
+            str(product.id) for product in self.shopping_list_products
+        }
+        assert len(json_response["fridge_ownerships"]) == 1
+        assert json_response["deleted"] == []
+
+    def test_changes_since_cursor(self, django_assert_num_queries):
+        cursor = self.client.get(self.url).json()["cursor"]
+        baker.make(
+            "products.FridgeProductHistory",
+            product=self.products[0],
+            status=FridgeProductStatus.UNUSED,
+            quantity=Decimal(2),
+        )
+        deleted_product_id = self.products[1].id
+        self.products[1].delete()
+        new_product = baker.make("products.ShoppingListProduct", shopping_list=self.shopping_list)
+
+        with django_assert_num_queries(7):
+            response = self.client.get(self.url, {"since": cursor})
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert json_response["reset"] is False
+        assert self._ids(json_response["fridge_products"]) == {str(self.products[0].id)}
+        assert json_response["fridge_products"][0]["quantity_left"] == "2.000"
+        assert len(json_response["fridge_product_history"]) == 1
+        assert self._ids(json_response["shopping_list_products"]) == {str(new_product.id)}
+        # adding product updates archive flag of the list
+        assert self._ids(json_response["shopping_lists"]) == {str(self.shopping_list.id)}
+        assert json_response["fridge_ownerships"] == []
+        assert [(row["model"], row["id"]) for row in json_response["deleted"]] == [
+            (SyncModel.FRIDGE_PRODUCT, str(deleted_product_id))
+        ]
+
+    def test_changes_of_shared_and_left_fridges(self):
+        cursor = self.client.get(self.url).json()["cursor"]
+        shared_fridge = baker.make("fridges.FridgeOwnership", user=self.user).fridge
+        shared_products = baker.make("products.FridgeProduct", fridge=shared_fridge, _quantity=2)
+        FridgeProduct.objects.filter(fridge=shared_fridge).update(updated_at=timezone.now() - datetime.timedelta(1))
+        self.user.fridge_ownership.get(fridge=self.fridge).delete()
+
+        json_response = self.client.get(self.url, {"since": cursor}).json()
+
+        assert self._ids(json_response["fridge_products"]) == {str(product.id) for product in shared_products}
+        assert [ownership["fridge"] for ownership in json_response["fridge_ownerships"]] == [str(shared_fridge.id)]
+        assert [(row["model"], row["fridge_id"]) for row in json_response["deleted"]] == [
+            (SyncModel.FRIDGE_OWNERSHIP, str(self.fridge.id))
+        ]
+
+    def test_changes_with_expired_cursor_sends_everything(self):
+        since = timezone.now() - datetime.timedelta(days=31)
+
+        json_response = self.client.get(self.url, {"since": since.isoformat()}).json()
+
+        assert json_response["reset"] is True
+        assert len(json_response["fridge_products"]) == 3
+
+    def test_prune_tombstones(self):
+        expired_product_id, product_id = self.products[0].id, self.products[1].id
+        self.products[0].delete()
+        self.products[1].delete()
+        Tombstone.objects.filter(object_id=expired_product_id).update(
+            deleted_at=timezone.now() - datetime.timedelta(days=31)
+        )
+
+        call_command("prune_tombstones", stdout=StringIO())
+
+        assert list(Tombstone.objects.values_list("object_id", flat=True)) == [product_id]
+
+
+@pytest.mark.django_db
+class TestMutationsViews:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("mutations")
+        self.fridge = baker.make("fridges.FridgeOwnership", user=self.user, permission=UserPermission.WRITE).fridge
+        self.shopping_list_product = baker.make(
+            "products.ShoppingListProduct",
+            shopping_list=baker.make(
+                "shopping_lists.ShoppingListOwnership", user=self.user, permission=UserPermission.WRITE
+            ).shopping_list,
+        )
+        self.operations = [
+            {
+                "key": "create-product",
+                "resource": "fridge_product",
+                "action": "create",
+                "data": {
+                    "name": "Milk",
+                    "fridge": str(self.fridge.id),
+                    "quantity_type": QuantityType.L,
+                    "product_history": {"status": FridgeProductStatus.UNUSED, "quantity": "2"},
+                },
+            },
+            {
+                "key": "drink-milk",
+                "resource": "fridge_product_history",
+                "action": "create",
+                "data": {"status": FridgeProductStatus.USED, "quantity": "0.5"},
+                "refs": {"product": "create-product"},
+            },
+            {
+                "key": "take-product",
+                "resource": "shopping_list_product",
+                "action": "partial_update",
+                "id": str(self.shopping_list_product.id),
+                "data": {"status": ShoppingListProductStatus.TAKER},
+            },
+        ]
+
+    def test_mutations(self):
+        response = self.client.post(self.url, {"operations": self.operations}, format="json")
+        results = response.json()["results"]
+
+        assert response.status_code == 200
+        assert [(result["key"], result["status"], result["replayed"]) for result in results] == [
+            ("create-product", 201, False),
+            ("drink-milk", 201, False),
+            ("take-product", 200, False),
+        ]
+        product = FridgeProduct.objects.get(id=results[0]["data"]["id"])
+        assert product.quantity_left == Decimal("1.5")
+        self.shopping_list_product.refresh_from_db()
+        assert self.shopping_list_product.taken_by == self.user
+
+    def test_mutations_replay_is_not_repeated(self):
+        first_results = self.client.post(self.url, {"operations": self.operations}, format="json").json()["results"]
+
+        response = self.client.post(self.url, {"operations": self.operations}, format="json")
+        results = response.json()["results"]
+
+        assert all(result["replayed"] for result in results)
+        assert [result["data"] for result in results] == [result["data"] for result in first_results]
+        assert FridgeProduct.objects.count() == 1
+        assert FridgeProductHistory.objects.count() == 2
+
+    def test_failed_mutation_does_not_undo_others(self):
+        self.operations[1]["refs"] = {}
+        self.operations[1]["data"]["product"] = str(baker.make("products.FridgeProduct").id)
+
+        results = self.client.post(self.url, {"operations": self.operations}, format="json").json()["results"]
+
+        assert [result["status"] for result in results] == [201, 403, 200]
+        assert FridgeProduct.objects.filter(fridge=self.fridge).exists()
+        assert set(IdempotencyKey.objects.values_list("key", flat=True)) == {"create-product", "take-product"}
+
+    def test_mutations_with_duplicated_keys(self):
+        self.operations[1]["key"] = "create-product"
+
+        response = self.client.post(self.url, {"operations": self.operations}, format="json")
+
+        assert response.status_code == 400
+        assert not FridgeProduct.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_delete_user_with_memberships():
+    user = baker.make("users.User")
+    fridge = baker.make("fridges.FridgeOwnership", user=user, permission=UserPermission.CREATOR).fridge
+    baker.make("shopping_lists.ShoppingListOwnership", user=user, permission=UserPermission.CREATOR)
+    user_id = user.id
+
+    user.delete()
+
+    assert set(Tombstone.objects.filter(user_id=user_id).values_list("model", flat=True)) == {
+        SyncModel.FRIDGE_OWNERSHIP,
+        SyncModel.SHOPPING_LIST_OWNERSHIP,
+    }
+    assert Tombstone.objects.filter(fridge_id=fridge.id).exists()
@@ -0,0 +1,8 @@
+from django.urls import path
+
+from . import views
+
+api_urls = [
+    path("changes", views.ChangesView.as_view(), name="changes"),
+    path("mutations", views.MutationsView.as_view(), name="mutations"),
+]
@@ -0,0 +1,63 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from drf_spectacular.utils import extend_schema
+from rest_framework import generics
+from rest_framework.response import Response
+
+from .changes import collect_changes
+from .models import IdempotencyKey, Tombstone
+from .mutations import run_mutations
+from .serializers import (
+    ChangesQuerySerializer,
+    ChangesSerializer,
+    MutationResultsSerializer,
+    MutationsSerializer,
+)
+
+
+class ChangesView(generics.GenericAPIView):
+    queryset = Tombstone.objects.none()
+    serializer_class = ChangesSerializer
+
+    @extend_schema(parameters=[ChangesQuerySerializer])
+    def get(self, request, format=None):
+        """
+        Products, history and shopping lists created, updated or deleted since the cursor of the previous sync.
+
+        Without cursor, or with one older than kept tombstones, whole data is sent with `reset` set.
+        """
+        query_serializer = ChangesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        since = query_serializer.validated_data.get("since")
+
+        now = timezone.now()
+        if since and since < now - datetime.timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS):
+            since = None
+        # rows saved by transactions still running now get earlier timestamps, the next sync reads them again
+        cursor = now - datetime.timedelta(seconds=settings.SYNC_CURSOR_OVERLAP)
+        changes = collect_changes(request.user, since)
+
+        serializer = self.get_serializer(
+            {"cursor": cursor.astimezone(datetime.timezone.utc).isoformat(), "reset": since is None, **changes}
+        )
+        return Response(serializer.data)
+
+
+class MutationsView(generics.GenericAPIView):
+    queryset = IdempotencyKey.objects.none()
+    serializer_class = MutationsSerializer
+
+    @extend_schema(responses=MutationResultsSerializer)
+    def post(self, request, format=None):
+        """
+        Upload writes queued by offline client, run in order in one transaction.
+
+        Every operation gets its own result, failed operations do not undo the others. Operations with keys of
+        earlier successful uploads are not run again, their stored results are returned.
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results = run_mutations(request, serializer.validated_data["operations"])
+        return Response(MutationResultsSerializer({"results": results}).data)
@@ -13,14 +13,18 @@ from drf_spectacular.views import (
 from fridger.fridges.urls import api_urls as fridges_urls
 from fridger.products.urls import api_urls as products_urls
 from fridger.shopping_lists.urls import api_urls as shopping_lists_urls
+from fridger.sync.urls import api_urls as sync_urls
 from fridger.users.urls import api_urls as users_urls
 from fridger.users.urls import frontend_urls
+from fridger.utils.views import QueryStatsView
 
 v1_urls = [
     path("", include(fridges_urls), name="fridge"),
     path("", include(products_urls), name="product"),
     path("", include(shopping_lists_urls), name="shopping_list"),
+    path("", include(sync_urls), name="sync"),
     path("", include(users_urls), name="user"),
+    path("stats/queries", QueryStatsView.as_view(), name="query-stats"),
     # Documentation
     path("schema/", SpectacularAPIView.as_view(), name="schema"),
     path("schema/swagger-ui/", SpectacularSwaggerView.as_view(url_name="schema"), name="swagger-ui"),
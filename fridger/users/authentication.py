@@ -0,0 +1,102 @@
+import functools
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+
+
+class LocalTokenCache:
+    """Bounded LRU with TTL, kept separately by every process."""
+
+    def __init__(self, timeout, max_size):
+        self.timeout = timeout
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete_many(self, keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+
+
+class DjangoTokenCache:
+    """Django cache shared by all processes, so evictions are visible everywhere."""
+
+    key_prefix = "auth-token:"
+
+    def __init__(self, alias, timeout):
+        self.cache = caches[alias]
+        self.timeout = timeout
+
+    def get(self, key):
+        return self.cache.get(self.key_prefix + key)
+
+    def set(self, key, value):
+        self.cache.set(self.key_prefix + key, value, self.timeout)
+
+    def delete_many(self, keys):
+        self.cache.delete_many([self.key_prefix + key for key in keys])
+
+
+@functools.lru_cache(maxsize=None)
+def get_token_cache():
+    """Token cache built from settings, it is built again when they are changed, e.g. by `override_settings`."""
+    if settings.TOKEN_AUTHENTICATION_CACHE:
+        return DjangoTokenCache(settings.TOKEN_AUTHENTICATION_CACHE, settings.TOKEN_AUTHENTICATION_CACHE_TIMEOUT)
+    return LocalTokenCache(settings.TOKEN_AUTHENTICATION_CACHE_TIMEOUT, settings.TOKEN_AUTHENTICATION_CACHE_SIZE)
+
+
+def _cache_key(token_key):
+    # tokens are credentials, do not keep them in cache keys
+    return hashlib.sha256(token_key.encode()).hexdigest()
+
+
+def evict_tokens(token_keys):
+    get_token_cache().delete_many([_cache_key(token_key) for token_key in token_keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication which caches token with its user, so authenticated requests usually skip the auth query.
+
+    Entries are evicted when token is deleted on logout and when user is saved, e.g. after password change or
+    deactivation.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        cache_key = _cache_key(key)
+        cached_token = token_cache.get(cache_key)
+        if cached_token is not None:
+            # every request gets its own copy of the user
+            token = pickle.loads(cached_token)
+            return token.user, token
+
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(cache_key, pickle.dumps(token))
+        return user, token
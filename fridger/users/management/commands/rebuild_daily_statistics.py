@@ -0,0 +1,35 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from fridger.products.models import FridgeProductHistory, ShoppingListProduct
+from fridger.users.models import UserDailyStatistics
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild daily food and money statistics of users from fridge product history and shopping lists."
+
+    def handle(self, *args, **options):
+        daily_statistics = defaultdict(dict)
+
+        for row in FridgeProductHistory.objects.daily_food_stats():
+            user_id, day = row.pop("created_by"), row.pop("day")
+            daily_statistics[(user_id, day)].update({field: value for field, value in row.items() if value})
+
+        for row in ShoppingListProduct.objects.daily_money_spent():
+            daily_statistics[(row["taken_by"], row["day"])]["money_spent"] = row["money_spent"]
+
+        with transaction.atomic():
+            UserDailyStatistics.objects.all().delete()
+            UserDailyStatistics.objects.bulk_create(
+                [
+                    UserDailyStatistics(user_id=user_id, day=day, **statistics)
+                    for (user_id, day), statistics in daily_statistics.items()
+                ],
+                batch_size=1000,
+            )
+        self.stdout.write(f"Rebuilt {len(daily_statistics)} daily statistics.")
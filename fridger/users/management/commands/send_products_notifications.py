@@ -1,30 +1,209 @@
 import datetime
+import time
+import uuid
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
+from asgiref.local import Local
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Exists, OuterRef
 from django.utils.translation import gettext as _
 from django.utils.translation import ngettext
 from exponent_server_sdk import PushClient, PushMessage
 
+from fridger.fridges.models import FridgeOwnership
+from fridger.notifications.models import ProductExpirationNotification, PushTicket
+from fridger.notifications.senders import get_sender
 from fridger.products.models import FridgeProduct
 
 User = get_user_model()
 
+EXPIRATION_NOTIFICATION_DAYS = 3
+UUID_RANGE = 2 ** 128
+
+
+def shard_fridges_range(shard_index, shards):
+    """
+    Lookups of fridges in the shard.
+
+    Random UUIDs are uniformly distributed, so equal ranges of ids work like a hash and can use the primary key index.
+    """
+    fridges_range = {}
+    if shard_index > 0:
+        fridges_range["fridge__gte"] = uuid.UUID(int=UUID_RANGE * shard_index // shards)
+    if shard_index < shards - 1:
+        fridges_range["fridge__lt"] = uuid.UUID(int=UUID_RANGE * (shard_index + 1) // shards)
+    return fridges_range
+
+
+def drop_inherited_connections():
+    """
+    Runs in new worker process before it touches the database.
+
+    Forked connections share sockets with the parent, closing them would terminate the parent's sessions, so they are
+    only forgotten and the worker opens its own.
+    """
+    connections._connections = Local(connections.thread_critical)
+
+
+def send_shard_notifications(shard_index, shards, today, digest):
+    """Runs in worker process when shards are processed in parallel."""
+    started_at = time.monotonic()
+    result = Command().send_notifications(today, shard_fridges_range(shard_index, shards), digest)
+    return {"shard_index": shard_index, "seconds": time.monotonic() - started_at, **result}
+
 
 class Command(BaseCommand):
+    help = (
+        "Send push notifications about available products which expire in less than 3 days, "
+        "every product is notified once for each day left and once after it expires."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--digest",
+            action="store_true",
+            help="Send one summary of expiring products in the shard to every user instead of one push per product.",
+        )
+        parser.add_argument("--shards", type=int, default=1, help="Split fridges into this many shards.")
+        parser.add_argument("--shard-index", type=int, help="Process only this shard, e.g. on one of many hosts.")
+        parser.add_argument("--workers", type=int, default=1, help="Process shards in this many processes.")
+
     def handle(self, *args, **options):
-        products = FridgeProduct.objects.exclude(expiration_date__isnull=True).exclude(is_available=False)
-        for product in products:
-            fridge = product.fridge
-            mobile_tokens = list(
-                fridge.fridge_ownership.exclude(user__mobile_token="").values_list("user__mobile_token", flat=True)
+        shards = options["shards"]
+        if shards < 1:
+            raise CommandError("--shards should be positive.")
+        if options["shard_index"] is not None:
+            if not 0 <= options["shard_index"] < shards:
+                raise CommandError("--shard-index should be between 0 and --shards - 1.")
+            shard_indexes = [options["shard_index"]]
+        else:
+            shard_indexes = range(shards)
+
+        today = datetime.date.today()
+        arguments = [(shard_index, shards, today, options["digest"]) for shard_index in shard_indexes]
+        if options["workers"] > 1 and len(arguments) > 1:
+            # nothing open is left to be inherited by the workers
+            connections.close_all()
+            with ProcessPoolExecutor(
+                max_workers=options["workers"], initializer=drop_inherited_connections
+            ) as executor:
+                results = list(executor.map(send_shard_notifications, *zip(*arguments)))
+        else:
+            results = [send_shard_notifications(*shard_arguments) for shard_arguments in arguments]
+
+        for result in results:
+            self.stdout.write(
+                f"Shard {result['shard_index']}/{shards}: sent {result['sent']} notifications "
+                f"about {result['products']} products, {result['failed']} failed in {result['seconds']:.2f}s."
             )
-            days_difference = (product.expiration_date - datetime.date.today()).days
+        if len(results) > 1:
+            self.stdout.write(
+                f"Sent {sum(result['sent'] for result in results)} notifications "
+                f"about {sum(result['products'] for result in results)} products, "
+                f"{sum(result['failed'] for result in results)} failed."
+            )
+
+    def send_notifications(self, today, fridges_range, digest):
+        notified = ProductExpirationNotification.objects.filter(
+            product=OuterRef("pk"),
+            expiration_date=OuterRef("expiration_date"),
+            threshold=OuterRef("expiration_threshold"),
+        )
+        products = list(
+            FridgeProduct.objects.expiring(today, EXPIRATION_NOTIFICATION_DAYS)
+            .filter(~Exists(notified), **fridges_range)
+            .select_related("fridge")
+            .order_by("expiration_date")
+        )
+
+        fridges_mobile_tokens = defaultdict(list)
+        ownerships = (
+            FridgeOwnership.objects.filter(fridge__in={product.fridge_id for product in products})
+            .exclude(user__mobile_token="")
+            .values_list("fridge", "user__mobile_token")
+        )
+        for fridge_id, mobile_token in ownerships:
+            fridges_mobile_tokens[fridge_id].append(mobile_token)
 
-            if days_difference < 3 and len(mobile_tokens) > 0:
-                self._send_bulk_products_push_messages(mobile_tokens, fridge, product, days_difference)
+        if digest:
+            mobile_tokens_products = defaultdict(list)
+            for product in products:
+                for mobile_token in fridges_mobile_tokens[product.fridge_id]:
+                    mobile_tokens_products[mobile_token].append(product)
+            push_messages = [
+                self._digest_push_message(mobile_token, token_products, today)
+                for mobile_token, token_products in mobile_tokens_products.items()
+            ]
+        else:
+            push_messages = [
+                self._product_push_message(mobile_token, product, (product.expiration_date - today).days)
+                for product in products
+                for mobile_token in fridges_mobile_tokens[product.fridge_id]
+            ]
+        sent, failed, accepted_product_ids = self._publish(push_messages)
+        # products of failed messages stay pending for the next run, products nobody gets notified about are done
+        ProductExpirationNotification.objects.record(
+            [
+                product
+                for product in products
+                if str(product.id) in accepted_product_ids or not fridges_mobile_tokens[product.fridge_id]
+            ]
+        )
+        return {"products": len(products), "sent": sent, "failed": failed}
+
+    def _publish(self, push_messages):
+        """
+        Send messages in chunks of Expo batch size through one sender, failed chunk does not stop others.
+
+        Returns numbers of sent and failed messages and ids of products in messages accepted by Expo.
+        """
+        sender = get_sender()
+        batch_size = PushClient.DEFAULT_MAX_MESSAGE_COUNT
+        sent = failed = 0
+        accepted_product_ids = set()
+        for start in range(0, len(push_messages), batch_size):
+            chunk = push_messages[start : start + batch_size]
+            try:
+                push_tickets = sender.send(chunk)
+            except Exception:
+                failed += len(chunk)
+                continue
+            PushTicket.objects.record(push_tickets)
+            accepted_messages = [push_ticket.push_message for push_ticket in push_tickets if push_ticket.is_success()]
+            for push_message in accepted_messages:
+                accepted_product_ids.update(push_message.data.get("product_ids") or [push_message.data["product_id"]])
+            sent += len(accepted_messages)
+            failed += len(chunk) - len(accepted_messages)
+        return sent, failed, accepted_product_ids
 
-    def _send_bulk_products_push_messages(self, mobile_tokens, fridge, product, days_difference):
+    def _digest_push_message(self, mobile_token, products, today):
+        if len(products) == 1:
+            return self._product_push_message(mobile_token, products[0], (products[0].expiration_date - today).days)
+
+        fridges = list({product.fridge_id: product.fridge for product in products}.values())
+        title = _("Your products are going to expire")
+        body = _(
+            "%(products_count)s products from %(fridge_names)s expire in the next %(days)s days or have expired."
+        ) % {
+            "products_count": len(products),
+            "fridge_names": ", ".join(fridge.name for fridge in fridges),
+            "days": EXPIRATION_NOTIFICATION_DAYS,
+        }
+        return PushMessage(
+            to=mobile_token,
+            title=title,
+            body=body,
+            data={
+                "fridge_ids": [str(fridge.id) for fridge in fridges],
+                "product_ids": [str(product.id) for product in products],
+            },
+        )
+
+    def _product_push_message(self, mobile_token, product, days_difference):
+        fridge = product.fridge
         if days_difference > 0:
             title = _("%(product_name)s is going to expire") % {"product_name": product.name}
             body = ngettext(
@@ -54,17 +233,9 @@ class Command(BaseCommand):
                 "product_name": product.name,
                 "days_difference": abs(days_difference),
             }
-        try:
-            PushClient().publish_multiple(
-                [
-                    PushMessage(
-                        to=mobile_token,
-                        title=title,
-                        body=body,
-                        data={"fridge_id": str(fridge.id), "product_id": str(product.id)},
-                    )
-                    for mobile_token in mobile_tokens
-                ]
-            )
-        except:
-            pass
+        return PushMessage(
+            to=mobile_token,
+            title=title,
+            body=body,
+            data={"fridge_id": str(fridge.id), "product_id": str(product.id)},
+        )
@@ -1,6 +1,6 @@
 from django.contrib.auth.base_user import BaseUserManager
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, models, transaction
+from django.db.models import F, Q, Sum
 
 
 class CustomUserManager(BaseUserManager):
@@ -34,3 +34,39 @@ class FriendQuerySet(models.QuerySet):
         return self.filter(
             Q(Q(friend_1=user_1) & Q(friend_2=user_2)) | Q(Q(friend_1=user_2) & Q(friend_2=user_1))
         ).exists()
+
+
+class UserDailyStatisticsQuerySet(models.QuerySet):
+    def add(self, user_id, day, **deltas):
+        """Shift statistics of user's `day` by `deltas`, creating the day if it is missing."""
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not user_id or not deltas:
+            return
+        increments = {field: F(field) + delta for field, delta in deltas.items()}
+        if self.filter(user_id=user_id, day=day).update(**increments):
+            return
+        try:
+            with transaction.atomic():
+                self.create(user_id=user_id, day=day, **deltas)
+        except IntegrityError:
+            # created concurrently by another request
+            self.filter(user_id=user_id, day=day).update(**increments)
+
+    def subtract(self, user_id, day, **deltas):
+        """Shift statistics of user's `day` back by `deltas` of removed rows, a missing day has nothing to subtract."""
+        decrements = {field: F(field) - delta for field, delta in deltas.items() if delta}
+        if user_id and decrements:
+            self.filter(user_id=user_id, day=day).update(**decrements)
+
+    def statistics(self, windows):
+        """Statistics summed over days of every window, `windows` maps name to `(first_day, end_day)` range."""
+        aggregates = {}
+        for index, (name, (first_day, end_day)) in enumerate(windows.items()):
+            days = Q(day__gte=first_day, day__lt=end_day)
+            for field in self.model.STATISTICS_FIELDS:
+                aggregates[f"stat_{index}_{field}"] = (name, field, Sum(field, filter=days))
+        results = self.aggregate(**{alias: aggregate for alias, (_, _, aggregate) in aggregates.items()})
+        stats = {name: {} for name in windows}
+        for alias, (name, field, _) in aggregates.items():
+            stats[name][field] = results[alias]
+        return stats
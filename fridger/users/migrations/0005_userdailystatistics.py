@@ -0,0 +1,36 @@
+# Generated by Django 3.2.7 on 2026-10-18 12:29
+
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_remove_user_can_use_real_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDailyStatistics',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('day', models.DateField(verbose_name='Day')),
+                ('eaten_liters', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('eaten_kilograms', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('eaten_pieces', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('wasted_liters', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('wasted_kilograms', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('wasted_pieces', models.DecimalField(decimal_places=6, default=Decimal('0'), max_digits=16)),
+                ('money_spent', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=12)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_statistics', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='userdailystatistics',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_user_daily_statistics'),
+        ),
+    ]
@@ -1,26 +1,80 @@
+import datetime
 from decimal import Decimal
 
 from django.contrib.auth.models import AbstractUser
+from django.core.signals import setting_changed
 from django.db import models
-from django.db.models import Case, F, Q, Sum, When
-from django.db.models.functions import Coalesce
+from django.db.models import signals
+from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.translation import gettext as _
+from rest_framework.authtoken.models import Token
 
-from fridger.utils.enums import (
-    FridgeProductStatus,
-    QuantityType,
-    ShoppingListProductStatus,
-)
+from fridger.users.authentication import evict_tokens, get_token_cache
 from fridger.utils.models import BaseModel
 
-from .managers import CustomUserManager, FriendQuerySet
+from .managers import CustomUserManager, FriendQuerySet, UserDailyStatisticsQuerySet
 
 
 def avatar_path(instance, filename):
     return f"avatar-{instance.id}"
 
 
+def _day_start(date):
+    return timezone.localtime(date).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _next_day_start(date):
+    day_start = _day_start(date)
+    return day_start if day_start == date else day_start + datetime.timedelta(days=1)
+
+
+def statistics_buckets(bucket, first_day, last_day):
+    """Start days of `bucket` ("day", "week" or "month") periods covering days from `first_day` to `last_day`."""
+    if bucket == "week":
+        day = first_day - datetime.timedelta(days=first_day.weekday())
+    elif bucket == "month":
+        day = first_day.replace(day=1)
+    else:
+        day = first_day
+    buckets = []
+    while day <= last_day:
+        buckets.append(day)
+        try:
+            if bucket == "week":
+                day += datetime.timedelta(days=7)
+            elif bucket == "month":
+                day = (day + datetime.timedelta(days=31)).replace(day=1)
+            else:
+                day += datetime.timedelta(days=1)
+        except OverflowError:
+            # the last bucket starts before `date.max`
+            break
+    return buckets
+
+
+def statistics_buckets_count(bucket, first_day, last_day):
+    """Number of `statistics_buckets`, computed without building them."""
+    if first_day > last_day:
+        return 0
+    if bucket == "week":
+        return ((last_day - first_day).days + first_day.weekday()) // 7 + 1
+    if bucket == "month":
+        return (last_day.year * 12 + last_day.month) - (first_day.year * 12 + first_day.month) + 1
+    return (last_day - first_day).days + 1
+
+
+def statistics_series_range(first_day, last_day):
+    """Datetime range from start of `first_day` to end of `last_day`, raises `OverflowError` near `date.max`."""
+    start_date = _day_start(timezone.make_aware(datetime.datetime.combine(first_day, datetime.time.min)))
+    return start_date, start_date + datetime.timedelta(days=(last_day - first_day).days + 1)
+
+
+def _sum_or_none(values):
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
 class User(AbstractUser, BaseModel):
     email = models.EmailField(_("Email"), unique=True)
     username = models.CharField(_("Username"), max_length=40, unique=True)
@@ -38,102 +92,67 @@ class User(AbstractUser, BaseModel):
         return friends
 
     def food_stats(self, start_date=None, end_date=None):
-        products = self.fridge_product_history
-        if start_date:
-            products = products.filter(created_at__gte=start_date)
-        if end_date:
-            products = products.filter(created_at__lte=end_date)
-
-        stats = products.aggregate(
-            eaten_liters=Coalesce(
-                Sum(
-                    Case(
-                        When(
-                            status=FridgeProductStatus.USED,
-                            product__quantity_type=QuantityType.ML,
-                            then=F("quantity") / 1000,
-                        ),
-                        When(
-                            status=FridgeProductStatus.USED,
-                            product__quantity_type=QuantityType.L,
-                            then=F("quantity"),
-                        ),
-                        output_field=models.DecimalField(),
-                    ),
-                ),
-                Decimal(0),
-            ),
-            eaten_kilograms=Coalesce(
-                Sum(
-                    Case(
-                        When(
-                            status=FridgeProductStatus.USED,
-                            product__quantity_type=QuantityType.G,
-                            then=F("quantity") / 1000,
-                        ),
-                        When(
-                            status=FridgeProductStatus.USED,
-                            product__quantity_type=QuantityType.KG,
-                            then=F("quantity"),
-                        ),
-                        output_field=models.DecimalField(),
-                    )
-                ),
-                Decimal(0),
-            ),
-            eaten_pieces=Coalesce(
-                Sum("quantity", filter=Q(status=FridgeProductStatus.USED, product__quantity_type=QuantityType.PIECE)),
-                Decimal(0),
-            ),
-            wasted_liters=Coalesce(
-                Sum(
-                    Case(
-                        When(
-                            status=FridgeProductStatus.WASTED,
-                            product__quantity_type=QuantityType.ML,
-                            then=F("quantity") / 1000,
-                        ),
-                        When(
-                            status=FridgeProductStatus.WASTED,
-                            product__quantity_type=QuantityType.L,
-                            then=F("quantity"),
-                        ),
-                        output_field=models.DecimalField(),
-                    )
-                ),
-                Decimal(0),
-            ),
-            wasted_kilograms=Coalesce(
-                Sum(
-                    Case(
-                        When(
-                            status=FridgeProductStatus.WASTED,
-                            product__quantity_type=QuantityType.G,
-                            then=F("quantity") / 1000,
-                        ),
-                        When(
-                            status=FridgeProductStatus.WASTED,
-                            product__quantity_type=QuantityType.KG,
-                            then=F("quantity"),
-                        ),
-                        output_field=models.DecimalField(),
-                    )
-                ),
-                Decimal(0),
-            ),
-            wasted_pieces=Coalesce(
-                Sum("quantity", filter=Q(status=FridgeProductStatus.WASTED, product__quantity_type=QuantityType.PIECE)),
-                Decimal(0),
-            ),
-        )
-        return stats
-
-    def money_spent_stats(self, start_date, end_date=timezone.datetime.now()):
-        products = self.shopping_list_product
-        if start_date and end_date:
-            products = products.filter(updated_at__gte=start_date, updated_at__lte=end_date)
-        stats = products.filter(status=ShoppingListProductStatus.BUYER).aggregate(money_spent=Sum("price"))
-        return stats
+        return self.fridge_product_history.food_stats({"food_stats": (start_date, end_date)})["food_stats"]
+
+    def money_spent_stats(self, start_date=None, end_date=None):
+        return self.shopping_list_product.money_spent_stats({"money_spent": (start_date, end_date)})["money_spent"]
+
+    def statistics(self, windows, end_date=None):
+        """
+        Food and money statistics of every window, `windows` maps window name to its start date.
+
+        Whole days are read from daily statistics, raw rows are scanned only for today and the partial first day.
+        """
+        end_date = end_date or timezone.now()
+        today_start = _day_start(end_date)
+        raw_windows = {None: (today_start, end_date)}
+        daily_windows = {}
+        for name, start_date in windows.items():
+            if start_date and start_date >= today_start:
+                raw_windows[name] = (start_date, end_date)
+                continue
+            first_day_start = today_start
+            if start_date:
+                first_day_start = min(_next_day_start(start_date), today_start)
+                raw_windows[name] = (start_date, first_day_start)
+            daily_windows[name] = (first_day_start.date() if start_date else datetime.date.min, today_start.date())
+
+        food_stats = self.fridge_product_history.food_stats(raw_windows)
+        money_spent_stats = self.shopping_list_product.money_spent_stats(raw_windows)
+        daily_stats = self.daily_statistics.statistics(daily_windows)
+
+        statistics = {}
+        for name in windows:
+            parts = [{**food_stats[name], **money_spent_stats[name]}] if name in raw_windows else []
+            if name in daily_windows:
+                parts += [{**food_stats[None], **money_spent_stats[None]}, daily_stats[name]]
+            stats = {
+                field: _sum_or_none(part[field] for part in parts) for field in UserDailyStatistics.STATISTICS_FIELDS
+            }
+            money_spent = stats.pop("money_spent")
+            statistics[name] = {"food_stats": stats, "money_spent": money_spent}
+        return statistics
+
+    def statistics_series(self, bucket, first_day, last_day):
+        """Food and money statistics of every `bucket` period between `first_day` and `last_day`."""
+        start_date, end_date = statistics_series_range(first_day, last_day)
+        food_stats = {
+            row.pop("bucket"): row
+            for row in self.fridge_product_history.food_stats_series(bucket, start_date, end_date)
+        }
+        money_spent_stats = {
+            row["bucket"]: row["money_spent"]
+            for row in self.shopping_list_product.money_spent_series(bucket, start_date, end_date)
+        }
+        no_food_stats = {field: Decimal(0) for field in UserDailyStatistics.STATISTICS_FIELDS if field != "money_spent"}
+        return [
+            {
+                "bucket": day,
+                "food_stats": food_stats.get(day, no_food_stats),
+                "money_spent": money_spent_stats.get(day),
+            }
+            for day in statistics_buckets(bucket, first_day, last_day)
+        ]
 
     def __str__(self):
         return self.email
@@ -164,3 +183,51 @@ class Friend(BaseModel):
 
     def __str__(self) -> str:
         return f"{self.friend_1} - {self.friend_2}"
+
+
+class UserDailyStatistics(BaseModel):
+    STATISTICS_FIELDS = (
+        "eaten_liters",
+        "eaten_kilograms",
+        "eaten_pieces",
+        "wasted_liters",
+        "wasted_kilograms",
+        "wasted_pieces",
+        "money_spent",
+    )
+
+    user = models.ForeignKey(User, related_name="daily_statistics", on_delete=models.CASCADE)
+    day = models.DateField(_("Day"))
+
+    eaten_liters = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    eaten_kilograms = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    eaten_pieces = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    wasted_liters = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    wasted_kilograms = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    wasted_pieces = models.DecimalField(max_digits=16, decimal_places=6, default=Decimal(0))
+    money_spent = models.DecimalField(max_digits=12, decimal_places=2, default=Decimal(0))
+
+    objects = UserDailyStatisticsQuerySet.as_manager()
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=("user", "day"), name="unique_user_daily_statistics")]
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.day}"
+
+
+@receiver(setting_changed)
+def token_cache_setting_changed_signal(sender, setting, **kwargs):
+    if setting.startswith("TOKEN_AUTHENTICATION_CACHE"):
+        get_token_cache.cache_clear()
+
+
+@receiver(signals.post_delete, sender=Token)
+def token_post_delete_signal(sender, instance, **kwargs):
+    evict_tokens([instance.key])
+
+
+@receiver(signals.post_save, sender=User)
+def user_post_save_signal(sender, instance, created, **kwargs):
+    if not created:
+        evict_tokens(Token.objects.filter(user=instance).values_list("key", flat=True))
@@ -1,9 +1,10 @@
+from django.utils import timezone
 from django.utils.translation import gettext as _
 from djoser.serializers import TokenCreateSerializer as DjoserTokenCreateSerializer
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
-from .models import Friend, User
+from .models import Friend, User, statistics_buckets_count, statistics_series_range
 
 #########
 # USERS #
@@ -161,3 +162,31 @@ class GeneralStatisticsSerializer(serializers.Serializer):
     last_24_hours = StatisticsSerializer(read_only=True)
     last_7_days = StatisticsSerializer(read_only=True)
     last_30_days = StatisticsSerializer(read_only=True)
+
+
+class StatisticsSeriesQuerySerializer(serializers.Serializer):
+    max_buckets = 366
+
+    bucket = serializers.ChoiceField(choices=["day", "week", "month"], default="day")
+    start = serializers.DateField()
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError({"start": _("Start should not be after end.")})
+        if statistics_buckets_count(attrs["bucket"], attrs["start"], attrs["end"]) > self.max_buckets:
+            raise serializers.ValidationError(
+                _("Range should not contain more than %(max_buckets)s buckets.") % {"max_buckets": self.max_buckets}
+            )
+        try:
+            statistics_series_range(attrs["start"], attrs["end"])
+        except OverflowError:
+            raise serializers.ValidationError({"end": _("End is out of supported range.")})
+        return attrs
+
+
+class StatisticsSeriesSerializer(serializers.Serializer):
+    bucket = serializers.DateField(read_only=True)
+    food_stats = FoodStatisticsSerializer(read_only=True)
+    money_spent = serializers.DecimalField(max_digits=9, decimal_places=2, read_only=True)
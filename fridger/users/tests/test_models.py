@@ -1,7 +1,9 @@
+import datetime
+
 import pytest
 from model_bakery import baker
 
-from fridger.users.models import Friend
+from fridger.users.models import Friend, statistics_buckets, statistics_buckets_count
 
 
 @pytest.mark.django_db
@@ -64,3 +66,17 @@ class TestFriendsModels:
         is_in_friendship = friend.is_in_friendship(self.test_user)
 
         assert not is_in_friendship
+
+
+@pytest.mark.parametrize("bucket", ["day", "week", "month"])
+@pytest.mark.parametrize(
+    "first_day, last_day",
+    [
+        (datetime.date(2021, 1, 31), datetime.date(2021, 1, 31)),
+        (datetime.date(2021, 1, 31), datetime.date(2021, 3, 1)),
+        (datetime.date(2021, 3, 7), datetime.date(2022, 3, 8)),
+        (datetime.date(9999, 12, 1), datetime.date(9999, 12, 31)),
+    ],
+)
+def test_statistics_buckets_count(bucket, first_day, last_day):
+    assert statistics_buckets_count(bucket, first_day, last_day) == len(statistics_buckets(bucket, first_day, last_day))
@@ -1,8 +1,30 @@
+from decimal import Decimal
+from io import StringIO
+
 import pytest
+from django.core.management import call_command
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from exponent_server_sdk import PushClient, PushTicket
 from model_bakery import baker
+from rest_framework.authtoken.models import Token
 from rest_framework.reverse import reverse
 from rest_framework.test import APIClient
 
+from fridger.notifications.models import ProductExpirationNotification, PushNotification
+from fridger.products.models import FridgeProduct, FridgeProductHistory
+from fridger.users.authentication import get_token_cache
+from fridger.users.management.commands.send_products_notifications import (
+    drop_inherited_connections,
+)
+from fridger.users.models import UserDailyStatistics
+from fridger.utils.enums import (
+    FridgeProductStatus,
+    QuantityType,
+    ShoppingListProductStatus,
+)
+
 
 @pytest.mark.django_db
 class TestFriendsQueryParams:
@@ -63,3 +85,382 @@ class TestFriendsQueryParams:
         assert any(item["friend"]["id"] == str(friend_out_2.id) for item in response_data)
         assert not any(item["friend"]["id"] == str(friend_in_1.id) for item in response_data)
         assert not any(item["friend"]["id"] == str(friend_in_2.id) for item in response_data)
+
+    def test_create_friend_enqueues_push_notification(self):
+        receiver = baker.make("users.User", mobile_token="ExponentPushToken[a]")
+
+        response = self.client.post(reverse("friend-list"), {"friend_to_add": receiver.id})
+
+        notification = PushNotification.objects.get()
+        assert response.status_code == 201
+        assert notification.mobile_token == "ExponentPushToken[a]"
+        assert notification.data == {"friend_id": response.json()["id"], "user_id": str(self.user.id)}
+
+
+@pytest.mark.django_db
+class TestCachedTokenAuthentication:
+    @pytest.fixture(autouse=True)
+    def setup(self, settings):
+        # every test gets an empty local cache
+        settings.TOKEN_AUTHENTICATION_CACHE = ""
+        self.user = baker.make("users.User")
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("friend-list")
+
+    def test_authenticated_request_skips_auth_query(self, django_assert_num_queries):
+        self.client.get(self.url)
+
+        with django_assert_num_queries(1):
+            response = self.client.get(self.url)
+
+        assert response.status_code == 200
+
+    def test_token_cache_follows_settings(self, settings, django_assert_num_queries):
+        settings.TOKEN_AUTHENTICATION_CACHE_TIMEOUT = 0
+        self.client.get(self.url)
+
+        with django_assert_num_queries(2):
+            response = self.client.get(self.url)
+
+        assert response.status_code == 200
+        assert get_token_cache().timeout == 0
+
+    def test_logout_evicts_token(self):
+        self.client.get(self.url)
+
+        logout_response = self.client.post("/api/v1/auth/users/logout")
+        response = self.client.get(self.url)
+
+        assert logout_response.status_code == 204
+        assert response.status_code == 401
+
+    def test_user_deactivation_evicts_token(self):
+        self.client.get(self.url)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+
+        assert response.status_code == 401
+
+
+@pytest.mark.django_db
+class TestStatisticsViews:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _make_history(self, quantity_type, status, quantity, days_ago=0):
+        history = baker.make(
+            "products.FridgeProductHistory",
+            product__quantity_type=quantity_type,
+            created_by=self.user,
+            status=status,
+            quantity=Decimal(quantity),
+        )
+        FridgeProductHistory.objects.filter(id=history.id).update(
+            created_at=timezone.now() - timezone.timedelta(days=days_ago)
+        )
+        return history
+
+    def test_statistics(self, django_assert_num_queries):
+        self._make_history(QuantityType.ML, FridgeProductStatus.USED, 500)
+        self._make_history(QuantityType.L, FridgeProductStatus.USED, 2, days_ago=3)
+        self._make_history(QuantityType.KG, FridgeProductStatus.WASTED, 1, days_ago=10)
+        self._make_history(QuantityType.PIECE, FridgeProductStatus.USED, 4, days_ago=40)
+        self._make_history(QuantityType.G, FridgeProductStatus.UNUSED, 300)
+        baker.make(
+            "products.ShoppingListProduct",
+            taken_by=self.user,
+            status=ShoppingListProductStatus.BUYER,
+            price=Decimal("12.50"),
+        )
+        call_command("rebuild_daily_statistics", stdout=StringIO())
+
+        with django_assert_num_queries(3):
+            response = self.client.get(reverse("statistics"))
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert json_response["last_24_hours"]["food_stats"]["eaten"]["liters"] == "0.500"
+        assert json_response["last_24_hours"]["money_spent"] == "12.50"
+        assert json_response["last_7_days"]["food_stats"]["eaten"]["liters"] == "2.500"
+        assert json_response["last_7_days"]["food_stats"]["wasted"]["kilograms"] == "0.000"
+        assert json_response["last_30_days"]["food_stats"]["wasted"]["kilograms"] == "1.000"
+        assert json_response["last_30_days"]["food_stats"]["eaten"]["pieces"] == "0.000"
+
+    def test_statistics_any_number_of_windows(self, django_assert_num_queries):
+        self._make_history(QuantityType.PIECE, FridgeProductStatus.USED, 4, days_ago=40)
+        call_command("rebuild_daily_statistics", stdout=StringIO())
+        now = timezone.now()
+        windows = {f"last_{days}_days": now - timezone.timedelta(days=days) for days in [1, 7, 30, 90, 365]}
+
+        with django_assert_num_queries(3):
+            statistics = self.user.statistics(windows, end_date=now)
+
+        assert statistics["last_30_days"]["food_stats"]["eaten_pieces"] == 0
+        assert statistics["last_90_days"]["food_stats"]["eaten_pieces"] == 4
+        assert statistics["last_365_days"]["money_spent"] == 0
+
+    def test_statistics_reads_only_raw_ranges(self):
+        now = timezone.now()
+        windows = {f"last_{days}_days": now - timezone.timedelta(days=days) for days in [7, 365]}
+
+        with CaptureQueriesContext(connection) as context:
+            self.user.statistics(windows, end_date=now)
+
+        # today and the partial first day of every window, not the whole year
+        history_sql = next(query["sql"] for query in context.captured_queries if "fridgeproducthistory" in query["sql"])
+        where = history_sql.split("WHERE", 1)[1]
+        assert where.count(" OR ") == 2
+
+    def test_statistics_reads_past_days_from_daily_statistics(self):
+        day = timezone.localdate() - timezone.timedelta(days=3)
+        baker.make(
+            "users.UserDailyStatistics",
+            user=self.user,
+            day=day,
+            eaten_liters=Decimal(2),
+            money_spent=Decimal("7.00"),
+        )
+        self._make_history(QuantityType.L, FridgeProductStatus.USED, 1)
+
+        response = self.client.get(reverse("statistics"))
+        json_response = response.json()
+
+        assert json_response["last_24_hours"]["food_stats"]["eaten"]["liters"] == "1.000"
+        assert json_response["last_7_days"]["food_stats"]["eaten"]["liters"] == "3.000"
+        assert json_response["last_7_days"]["money_spent"] == "7.00"
+
+    def test_daily_statistics_follow_writes(self):
+        self._make_history(QuantityType.G, FridgeProductStatus.WASTED, 250)
+        product = baker.make(
+            "products.ShoppingListProduct",
+            taken_by=self.user,
+            status=ShoppingListProductStatus.TAKER,
+            price=Decimal("3.00"),
+        )
+        product.status = ShoppingListProductStatus.BUYER
+        product.save()
+
+        daily_statistics = UserDailyStatistics.objects.get(user=self.user, day=timezone.localdate())
+        assert daily_statistics.wasted_kilograms == Decimal("0.25")
+        assert daily_statistics.money_spent == Decimal("3.00")
+
+        product.delete()
+        FridgeProductHistory.objects.get(created_by=self.user).delete()
+
+        daily_statistics.refresh_from_db()
+        assert daily_statistics.wasted_kilograms == 0
+        assert daily_statistics.money_spent == 0
+
+    def test_daily_statistics_follow_cascade_deletes(self):
+        history = self._make_history(QuantityType.G, FridgeProductStatus.WASTED, 250)
+        self._make_history(QuantityType.L, FridgeProductStatus.USED, 1)
+        baker.make(
+            "products.FridgeProductHistory",
+            product=history.product,
+            created_by=self.user,
+            status=FridgeProductStatus.USED,
+            quantity=Decimal(100),
+        )
+        product = baker.make(
+            "products.ShoppingListProduct",
+            taken_by=self.user,
+            status=ShoppingListProductStatus.TAKER,
+            price=Decimal("3.00"),
+        )
+        product.status = ShoppingListProductStatus.BUYER
+        product.save()
+
+        history.product.delete()
+        product.shopping_list.delete()
+        followed = list(UserDailyStatistics.objects.values("user", "day", *UserDailyStatistics.STATISTICS_FIELDS))
+        call_command("rebuild_daily_statistics", stdout=StringIO())
+        rebuilt = list(UserDailyStatistics.objects.values("user", "day", *UserDailyStatistics.STATISTICS_FIELDS))
+
+        assert followed[0]["eaten_liters"] == Decimal(1)
+        assert followed == rebuilt
+
+    def test_statistics_series(self, django_assert_num_queries):
+        self._make_history(QuantityType.L, FridgeProductStatus.USED, 1)
+        self._make_history(QuantityType.L, FridgeProductStatus.USED, 2, days_ago=2)
+        self._make_history(QuantityType.PIECE, FridgeProductStatus.WASTED, 3, days_ago=2)
+        today = timezone.localdate()
+        start = today - timezone.timedelta(days=6)
+
+        with django_assert_num_queries(2):
+            response = self.client.get(reverse("statistics-series"), {"bucket": "day", "start": start.isoformat()})
+        json_response = response.json()
+
+        assert response.status_code == 200
+        assert len(json_response) == 7
+        assert json_response[0]["bucket"] == start.isoformat()
+        assert json_response[-1]["food_stats"]["eaten"]["liters"] == "1.000"
+        assert json_response[-3]["food_stats"]["eaten"]["liters"] == "2.000"
+        assert json_response[-3]["food_stats"]["wasted"]["pieces"] == "3.000"
+        assert json_response[-2]["food_stats"]["eaten"]["liters"] == "0.000"
+
+    def test_statistics_series_limits_buckets(self):
+        start = timezone.localdate() - timezone.timedelta(days=400)
+
+        response = self.client.get(reverse("statistics-series"), {"bucket": "day", "start": start.isoformat()})
+        month_response = self.client.get(reverse("statistics-series"), {"bucket": "month", "start": start.isoformat()})
+
+        assert response.status_code == 400
+        assert month_response.status_code == 200
+        assert len(month_response.json()) in [14, 15]
+
+    @pytest.mark.parametrize("bucket", ["day", "week", "month"])
+    def test_statistics_series_rejects_dates_out_of_range(self, bucket):
+        url = reverse("statistics-series")
+
+        end_of_time_response = self.client.get(url, {"bucket": bucket, "start": "9999-12-01", "end": "9999-12-31"})
+        huge_range_response = self.client.get(url, {"bucket": bucket, "start": "0001-01-01", "end": "9000-12-31"})
+
+        assert end_of_time_response.status_code == 400
+        assert huge_range_response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestProductsNotifications:
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        self.published = []
+        monkeypatch.setattr(PushClient, "publish_multiple", lambda client, messages: self._publish_multiple(messages))
+        self.fridge = baker.make("fridges.Fridge")
+        for mobile_token in ["ExponentPushToken[a]", "ExponentPushToken[b]", ""]:
+            baker.make("fridges.FridgeOwnership", fridge=self.fridge, user__mobile_token=mobile_token)
+
+    def _publish_multiple(self, push_messages):
+        self.published.append(push_messages)
+        return [
+            PushTicket(push_message=push_message, status="ok", message="", details=None, id=f"ticket-{index}")
+            for index, push_message in enumerate(push_messages)
+        ]
+
+    def _make_product(self, days, is_available=True):
+        return baker.make(
+            "products.FridgeProduct",
+            fridge=self.fridge,
+            is_available=is_available,
+            expiration_date=timezone.localdate() + timezone.timedelta(days=days),
+        )
+
+    def test_send_products_notifications(self, django_assert_num_queries):
+        expiring_product = self._make_product(1)
+        self._make_product(-2)
+        self._make_product(5)
+        self._make_product(1, is_available=False)
+
+        with django_assert_num_queries(4):
+            call_command("send_products_notifications", stdout=StringIO())
+
+        messages = [message for chunk in self.published for message in chunk]
+        assert len(self.published) == 1
+        assert len(messages) == 4
+        assert {message.to for message in messages} == {"ExponentPushToken[a]", "ExponentPushToken[b]"}
+        assert messages[-1].data == {"fridge_id": str(self.fridge.id), "product_id": str(expiring_product.id)}
+
+    def test_send_products_notifications_in_chunks(self):
+        for _ in range(60):
+            self._make_product(0)
+
+        call_command("send_products_notifications", stdout=StringIO())
+
+        assert [len(chunk) for chunk in self.published] == [100, 20]
+
+    def test_send_products_digest_notifications(self, django_assert_num_queries):
+        other_fridge = baker.make("fridges.Fridge", name="Office")
+        baker.make("fridges.FridgeOwnership", fridge=other_fridge, user__mobile_token="ExponentPushToken[a]")
+        products = [self._make_product(1), self._make_product(-1)]
+        products.append(
+            baker.make(
+                "products.FridgeProduct",
+                fridge=other_fridge,
+                is_available=True,
+                expiration_date=timezone.localdate(),
+            )
+        )
+
+        with django_assert_num_queries(4):
+            call_command("send_products_notifications", "--digest", stdout=StringIO())
+
+        messages = {message.to: message for chunk in self.published for message in chunk}
+        assert len(messages) == 2
+        assert messages["ExponentPushToken[a]"].body.startswith("3 products")
+        assert len(messages["ExponentPushToken[a]"].data["fridge_ids"]) == 2
+        assert messages["ExponentPushToken[b]"].body.startswith("2 products")
+        assert set(messages["ExponentPushToken[b]"].data["product_ids"]) == {
+            str(product.id) for product in products[:2]
+        }
+
+    def test_send_products_notifications_once_per_threshold(self, django_assert_num_queries):
+        product = self._make_product(2)
+        call_command("send_products_notifications", stdout=StringIO())
+        self.published = []
+
+        with django_assert_num_queries(1):
+            call_command("send_products_notifications", stdout=StringIO())
+
+        assert self.published == []
+
+        FridgeProduct.objects.filter(id=product.id).update(expiration_date=timezone.localdate() + timezone.timedelta(1))
+        call_command("send_products_notifications", stdout=StringIO())
+
+        assert len(self.published[0]) == 2
+        assert ProductExpirationNotification.objects.filter(product=product).count() == 2
+
+    def test_send_products_notifications_retries_failed_publish(self, monkeypatch):
+        product = self._make_product(1)
+
+        def publish_multiple(client, messages):
+            raise ConnectionError
+
+        with monkeypatch.context() as failing:
+            failing.setattr(PushClient, "publish_multiple", publish_multiple)
+            call_command("send_products_notifications", stdout=StringIO())
+
+        assert not ProductExpirationNotification.objects.exists()
+
+        call_command("send_products_notifications", stdout=StringIO())
+
+        assert len(self.published[0]) == 2
+        assert ProductExpirationNotification.objects.filter(product=product).count() == 1
+
+    def test_workers_drop_inherited_connections_without_closing(self, monkeypatch):
+        inherited = connections["default"]
+        inherited.ensure_connection()
+        # the test process keeps its connections after the test
+        monkeypatch.setattr(connections, "_connections", connections._connections)
+
+        drop_inherited_connections()
+
+        assert connections["default"] is not inherited
+        assert inherited.connection is not None
+
+    def test_send_products_notifications_in_shards(self):
+        fridges = [baker.make("fridges.Fridge") for _ in range(8)]
+        for fridge in fridges:
+            baker.make("fridges.FridgeOwnership", fridge=fridge, user__mobile_token=f"ExponentPushToken[{fridge.id}]")
+            baker.make(
+                "products.FridgeProduct",
+                fridge=fridge,
+                is_available=True,
+                expiration_date=timezone.localdate(),
+            )
+        out = StringIO()
+
+        call_command("send_products_notifications", "--shards", "4", "--shard-index", "1", stdout=out)
+        shard_tokens = {message.to for chunk in self.published for message in chunk}
+        call_command("send_products_notifications", "--shards", "4", stdout=out)
+        tokens = [message.to for chunk in self.published for message in chunk]
+
+        assert len(tokens) == len(set(tokens)) == 8
+        assert {f"ExponentPushToken[{fridge.id}]" for fridge in fridges} == set(tokens)
+        assert out.getvalue().startswith(f"Shard 1/4: sent {len(shard_tokens)} notifications")
+        assert "Shard 3/4" in out.getvalue()
@@ -24,7 +24,8 @@ auth_urls = [
 
 api_urls = [
     path("auth/users", include(auth_urls)),
-    path("statistics", views.StatisticsView.as_view()),
+    path("statistics", views.StatisticsView.as_view(), name="statistics"),
+    path("statistics/series", views.StatisticsSeriesView.as_view(), name="statistics-series"),
 ]
 
 api_urls += router.urls
@@ -1,17 +1,25 @@
+from django.db import transaction
 from django.shortcuts import render
 from django.utils import timezone
 from django.utils.translation import gettext as _
 from djoser.views import UserViewSet as DjoserUserViewSet
 from drf_spectacular.utils import extend_schema
-from exponent_server_sdk import PushClient, PushMessage
 from rest_framework import generics, mixins, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
+from fridger.notifications.models import PushNotification
+
 from .filters import FriendFilter
 from .models import Friend, User
 from .permissions import IsFriendRequestReceiver, IsOneOfFriend
-from .serializers import FriendSerializer, GeneralStatisticsSerializer, UserSerializer
+from .serializers import (
+    FriendSerializer,
+    GeneralStatisticsSerializer,
+    StatisticsSeriesQuerySerializer,
+    StatisticsSeriesSerializer,
+    UserSerializer,
+)
 
 
 def activate_account(request, uid, token):
@@ -52,23 +60,19 @@ class FriendViewSet(mixins.ListModelMixin, mixins.CreateModelMixin, mixins.Destr
         user = self.request.user
         return user.friends
 
+    @transaction.atomic
     def perform_create(self, serializer):
         friendship = serializer.save(friend_1=self.request.user)
         sender = friendship.friend_1
         receiver = friendship.friend_2
         if mobile_token := receiver.mobile_token:
-            try:
-                PushClient().publish(
-                    PushMessage(
-                        to=mobile_token,
-                        title=_("You have received an invitation to become a friend"),
-                        body=_("You have received an invitation to become a friend from %(username)s")
-                        % {"username": sender.username},
-                        data={"friend_id": str(friendship.id), "user_id": str(sender.id)},
-                    )
-                )
-            except:
-                pass
+            PushNotification.objects.enqueue(
+                mobile_token=mobile_token,
+                title=_("You have received an invitation to become a friend"),
+                body=_("You have received an invitation to become a friend from %(username)s")
+                % {"username": sender.username},
+                data={"friend_id": str(friendship.id), "user_id": str(sender.id)},
+            )
 
     def list(self, request, *args, **kwargs):
         """Friends of the currently logged in user."""
@@ -96,24 +100,30 @@ class StatisticsView(generics.GenericAPIView):
     queryset = User.objects.none()
     serializer_class = GeneralStatisticsSerializer
 
+    windows = {
+        "last_24_hours": timezone.timedelta(days=1),
+        "last_7_days": timezone.timedelta(days=7),
+        "last_30_days": timezone.timedelta(days=30),
+    }
+
     def get(self, request, format=None):
-        user = request.user
-        last_24_hours_start_date = timezone.datetime.now() - timezone.timedelta(days=1)
-        last_7_days_start_date = timezone.datetime.now() - timezone.timedelta(days=7)
-        last_30_days_start_date = timezone.datetime.now() - timezone.timedelta(days=30)
-        data = {
-            "last_24_hours": {
-                "food_stats": user.food_stats(last_24_hours_start_date),
-                **user.money_spent_stats(last_24_hours_start_date),
-            },
-            "last_7_days": {
-                "food_stats": user.food_stats(last_7_days_start_date),
-                **user.money_spent_stats(last_7_days_start_date),
-            },
-            "last_30_days": {
-                "food_stats": user.food_stats(last_30_days_start_date),
-                **user.money_spent_stats(last_30_days_start_date),
-            },
-        }
+        now = timezone.now()
+        windows = {name: now - duration for name, duration in self.windows.items()}
+        data = request.user.statistics(windows, end_date=now)
         serializer = self.get_serializer(data)
         return Response(serializer.data)
+
+
+class StatisticsSeriesView(generics.GenericAPIView):
+    queryset = User.objects.none()
+    serializer_class = StatisticsSeriesSerializer
+
+    @extend_schema(parameters=[StatisticsSeriesQuerySerializer])
+    def get(self, request, format=None):
+        """Food and money statistics grouped into day, week or month buckets."""
+        query_serializer = StatisticsSeriesQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        params = query_serializer.validated_data
+        data = request.user.statistics_series(params["bucket"], params["start"], params["end"])
+        serializer = self.get_serializer(data, many=True)
+        return Response(serializer.data)
@@ -29,3 +29,24 @@ class ShoppingListProductStatus(models.TextChoices):
     TAKER = "TAKER", _("Taker")
     TAKER_MARKED = "TAKER_MARKED", _("Taker marked")
     BUYER = "BUYER", _("Buyer")
+
+
+class PushNotificationStatus(models.TextChoices):
+    PENDING = "PENDING", _("Pending")
+    SENT = "SENT", _("Sent")
+    FAILED = "FAILED", _("Failed")
+
+
+class SyncModel(models.TextChoices):
+    FRIDGE_PRODUCT = "FRIDGE_PRODUCT", _("Fridge product")
+    FRIDGE_PRODUCT_HISTORY = "FRIDGE_PRODUCT_HISTORY", _("Fridge product history")
+    SHOPPING_LIST = "SHOPPING_LIST", _("Shopping list")
+    SHOPPING_LIST_PRODUCT = "SHOPPING_LIST_PRODUCT", _("Shopping list product")
+    FRIDGE_OWNERSHIP = "FRIDGE_OWNERSHIP", _("Fridge ownership")
+    SHOPPING_LIST_OWNERSHIP = "SHOPPING_LIST_OWNERSHIP", _("Shopping list ownership")
+
+
+class PushTicketStatus(models.TextChoices):
+    PENDING = "PENDING", _("Pending")
+    DELIVERED = "DELIVERED", _("Delivered")
+    FAILED = "FAILED", _("Failed")
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """Database execute wrapper counting queries and their time, works without `DEBUG` and `connection.queries`."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started_at
+            self.count += 1
+
+
+class EndpointStats:
+    """Totals of requests handled by this process, grouped by endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.endpoints = {}
+
+    def record(self, endpoint, queries, db_time, total_time, over_budget):
+        with self.lock:
+            stats = self.endpoints.setdefault(
+                endpoint,
+                {"requests": 0, "queries": 0, "max_queries": 0, "db_time": 0.0, "total_time": 0.0, "over_budget": 0},
+            )
+            stats["requests"] += 1
+            stats["queries"] += queries
+            stats["max_queries"] = max(stats["max_queries"], queries)
+            stats["db_time"] += db_time
+            stats["total_time"] += total_time
+            stats["over_budget"] += over_budget
+
+    def totals(self):
+        with self.lock:
+            return [{"endpoint": endpoint, **stats} for endpoint, stats in self.endpoints.items()]
+
+    def reset(self):
+        with self.lock:
+            self.endpoints.clear()
+
+
+endpoint_stats = EndpointStats()
+
+
+def endpoint_name(request):
+    """View class and action handling the request, e.g. `FridgeViewSet.list`."""
+    resolver_match = getattr(request, "resolver_match", None)
+    if resolver_match is None:
+        return None
+    view = getattr(resolver_match.func, "cls", resolver_match.func)
+    name = getattr(view, "__name__", resolver_match.view_name)
+    actions = getattr(resolver_match.func, "actions", None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f"{name}.{action}"
+
+
+class QueryBudgetMiddleware:
+    """Record query count, database time and total time of every endpoint and warn when it exceeds the budget."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        started_at = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        total_time = time.perf_counter() - started_at
+
+        endpoint = endpoint_name(request)
+        if endpoint is None:
+            return response
+        budget = settings.QUERY_BUDGETS.get(endpoint, settings.QUERY_BUDGET)
+        over_budget = counter.count > budget
+        if over_budget:
+            logger.warning(
+                "%s %s ran %s queries, budget is %s (%.1f ms in database, %.1f ms total).",
+                endpoint,
+                request.path,
+                counter.count,
+                budget,
+                counter.duration * 1000,
+                total_time * 1000,
+            )
+        endpoint_stats.record(endpoint, counter.count, counter.duration, total_time, over_budget)
+        return response
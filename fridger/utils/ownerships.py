@@ -0,0 +1,52 @@
+from django.apps import apps
+
+from fridger.utils.enums import UserPermission
+
+ADMIN_PERMISSIONS = [UserPermission.CREATOR, UserPermission.ADMIN]
+WRITE_PERMISSIONS = [UserPermission.CREATOR, UserPermission.ADMIN, UserPermission.WRITE]
+
+
+class OwnershipResolver:
+    """Fridge and shopping list ownerships of the user, each kind loaded with one query when first needed."""
+
+    resources = {
+        "fridge": "fridges.FridgeOwnership",
+        "shopping_list": "shopping_lists.ShoppingListOwnership",
+    }
+
+    def __init__(self, user):
+        self.user = user
+        self.ownerships = {}
+
+    def _ownerships(self, resource):
+        if resource not in self.ownerships:
+            Ownership = apps.get_model(self.resources[resource])
+            ownerships = Ownership.objects.filter(user=self.user).only("id", resource, "permission")
+            self.ownerships[resource] = {getattr(ownership, f"{resource}_id"): ownership for ownership in ownerships}
+        return self.ownerships[resource]
+
+    def fridge_ownership(self, fridge_id):
+        return self._ownerships("fridge").get(fridge_id)
+
+    def shopping_list_ownership(self, shopping_list_id):
+        return self._ownerships("shopping_list").get(shopping_list_id)
+
+    def fridge_permission(self, fridge_id):
+        ownership = self.fridge_ownership(fridge_id)
+        return ownership.permission if ownership else None
+
+    def shopping_list_permission(self, shopping_list_id):
+        ownership = self.shopping_list_ownership(shopping_list_id)
+        return ownership.permission if ownership else None
+
+    def add(self, resource, ownership):
+        """Keep loaded ownerships up to date after creating user's ownership in the request."""
+        if resource in self.ownerships:
+            self.ownerships[resource][getattr(ownership, f"{resource}_id")] = ownership
+
+
+def get_ownerships(request):
+    """Ownership resolver of the request user, shared by permissions and serializers handling the request."""
+    if getattr(request, "_ownerships", None) is None or request._ownerships.user != request.user:
+        request._ownerships = OwnershipResolver(request.user)
+    return request._ownerships
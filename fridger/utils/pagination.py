@@ -0,0 +1,103 @@
+import base64
+import binascii
+import json
+import uuid
+
+from django.utils.dateparse import parse_datetime
+from django.utils.translation import gettext as _
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over `(created_at, id)`, newest first.
+
+    It is opt-in, requests without `cursor` or `page_size` parameters get the whole list. The next page starts after
+    the last row of the current one, found by an index range instead of an `OFFSET` scan, and rows are never counted.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+    ordering_query_param = "ordering"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not {self.cursor_query_param, self.page_size_query_param} & request.query_params.keys():
+            return None
+        if request.query_params.get(self.ordering_query_param):
+            raise ValidationError({self.ordering_query_param: _("Ordering is not supported with cursor pagination.")})
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by("-created_at", "-id")
+        if cursor := request.query_params.get(self.cursor_query_param):
+            created_at, id = self.decode_cursor(cursor)
+            # the range on created_at is an index seek, only rows created at the same moment are checked by id
+            queryset = queryset.filter(created_at__lte=created_at).exclude(created_at=created_at, id__gte=id)
+
+        rows = list(queryset[: page_size + 1])
+        self.page = rows[:page_size]
+        self.has_next = len(rows) > page_size
+        return self.page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def encode_cursor(self, row):
+        position = json.dumps([row.created_at.isoformat(), str(row.id)])
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            created_at, id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            created_at = parse_datetime(created_at)
+            id = uuid.UUID(id)
+        except (AttributeError, binascii.Error, TypeError, ValueError):
+            created_at = None
+        if created_at is None:
+            raise NotFound(_("Invalid cursor."))
+        return created_at, id
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor of the next page, enables pagination.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page, enables pagination, at most {self.max_page_size}.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,50 @@
+import logging
+
+import pytest
+from model_bakery import baker
+from rest_framework.reverse import reverse
+from rest_framework.test import APIClient
+
+from fridger.utils.middleware import endpoint_stats
+
+
+@pytest.mark.django_db
+class TestQueryStatsViews:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        endpoint_stats.reset()
+        self.user = baker.make("users.User")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_endpoints_stats_are_recorded(self):
+        baker.make("fridges.FridgeOwnership", user=self.user, _quantity=2)
+
+        self.client.get(reverse("fridge-list"))
+        self.client.get(reverse("fridge-list"))
+        stats = {stats["endpoint"]: stats for stats in endpoint_stats.totals()}
+
+        assert stats["FridgeViewSet.list"]["requests"] == 2
+        assert stats["FridgeViewSet.list"]["queries"] == 2
+        assert stats["FridgeViewSet.list"]["max_queries"] == 1
+        assert stats["FridgeViewSet.list"]["over_budget"] == 0
+
+    def test_exceeded_budget_is_logged(self, settings, caplog):
+        settings.QUERY_BUDGETS = {"FridgeViewSet.list": 0}
+
+        with caplog.at_level(logging.WARNING, logger="fridger.utils.middleware"):
+            self.client.get(reverse("fridge-list"))
+
+        assert "FridgeViewSet.list /api/v1/fridges ran 1 queries, budget is 0" in caplog.text
+        assert endpoint_stats.totals()[0]["over_budget"] == 1
+
+    def test_query_stats_only_for_staff(self):
+        self.client.get(reverse("fridge-list"))
+
+        response = self.client.get(reverse("query-stats"))
+        self.user.is_staff = True
+        staff_response = self.client.get(reverse("query-stats"))
+
+        assert response.status_code == 403
+        assert staff_response.status_code == 200
+        assert staff_response.json()[0]["endpoint"] == "FridgeViewSet.list"
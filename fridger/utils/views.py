@@ -0,0 +1,18 @@
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .middleware import endpoint_stats
+
+
+class QueryStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, format=None):
+        """Query count and time totals of endpoints handled by this server process, most queries first."""
+        return Response(sorted(endpoint_stats.totals(), key=lambda stats: stats["queries"], reverse=True))
+
+    def delete(self, request, format=None):
+        """Reset totals."""
+        endpoint_stats.reset()
+        return Response(status=status.HTTP_204_NO_CONTENT)